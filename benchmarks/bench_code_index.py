@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for fuzzy product-code lookups
+Misreads codes from a synthetic catalog the way tesseract does and reports
+lookup time and how many misreads found their way back to the right code
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Run from anywhere inside the repository
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.code_index import OCR_CONFUSIONS, ProductCodeIndex
+
+SUFFIXES = ['C', 'HF', 'KD', 'G']
+
+
+def make_codes(count, seed=0):
+    """Random codes in the master list's 6 digits - 4 digits - letters layout"""
+    rng = random.Random(seed)
+    codes = set()
+    while len(codes) < count:
+        codes.add(f"{rng.randint(100000, 999999)}-{rng.randint(1000, 9999)}-{rng.choice(SUFFIXES)}")
+    return sorted(codes)
+
+
+def misread(code, rng):
+    """Swap one character for a lookalike, or for a random digit when it has none"""
+    positions = [i for i, char in enumerate(code) if char != '-']
+    i = rng.choice(positions)
+    lookalikes = [b for a, b in OCR_CONFUSIONS if a == code[i]] + [a for a, b in OCR_CONFUSIONS if b == code[i]]
+    replacement = rng.choice(lookalikes) if lookalikes else rng.choice('0123456789')
+    return code[:i] + replacement + code[i + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fuzzy product-code lookups')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Catalog sizes to benchmark')
+    parser.add_argument('--lookups', type=int, default=5000,
+                        help='Misread codes looked up per catalog')
+    args = parser.parse_args()
+
+    print(f"{'codes':>10} {'build s':>10} {'us/lookup':>10} {'correct':>8} {'no match':>9}")
+    for size in args.sizes:
+        codes = make_codes(size)
+        start = time.perf_counter()
+        index = ProductCodeIndex(codes)
+        build_seconds = time.perf_counter() - start
+
+        rng = random.Random(1)
+        truths = [rng.choice(codes) for _ in range(args.lookups)]
+        queries = [misread(code, rng) for code in truths]
+
+        start = time.perf_counter()
+        results = [index.best_match(query) for query in queries]
+        elapsed = time.perf_counter() - start
+
+        correct = sum(1 for result, truth in zip(results, truths) if result and result.code == truth)
+        unmatched = sum(1 for result in results if result is None)
+        print(f"{size:>10} {build_seconds:>10.2f} {elapsed / args.lookups * 1e6:>10.1f} "
+              f"{correct / args.lookups:>8.1%} {unmatched / args.lookups:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
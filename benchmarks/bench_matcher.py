@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for ProductMatcher.match_products
+Reports per-line matching cost for POs of increasing size, drawn from the
+real master list with a share of lines that don't match
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Run from anywhere inside the repository
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.line_items import LineItem
+from src.product_matcher import ProductMatcher
+
+
+def make_products(index, num_lines, unmatched=0.05, seed=0):
+    """Build parsed PO lines for products in the master index"""
+    rng = random.Random(seed)
+    keys = list(index)
+    products = []
+    for _ in range(num_lines):
+        code, length = rng.choice(keys)
+        if rng.random() < unmatched:
+            # A length the master list doesn't stock
+            length = 99
+        products.append(LineItem(code, f"{rng.randint(1, 400)}/{length}'", rng.choice(['2X4', '2X6', '1 X 4'])))
+    return products
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark product matching')
+    parser.add_argument('--master-file', default='productslist.xlsx',
+                        help='Path to master product list Excel file')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000],
+                        help='PO line counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Runs per size (best time is reported)')
+    args = parser.parse_args()
+
+    matcher = ProductMatcher(args.master_file)
+    print(f"{'lines':>10} {'total ms':>12} {'us/line':>10}")
+    for size in args.sizes:
+        products = make_products(matcher.index, size)
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            matcher.match_products(products)
+            best = min(best, time.perf_counter() - start)
+        print(f"{size:>10} {best * 1000:>12.3f} {best / size * 1e6:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-call overhead of the OCR backends
+Runs each backend repeatedly on a small rendered image, such as a header crop
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Run from anywhere inside the repository
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image, ImageDraw
+from src.ocr_backends import BACKENDS, create_backend
+from src.runtime_config import configure_tools
+
+
+def make_image():
+    """Render a tiny region-sized image so engine overhead dominates"""
+    image = Image.new('RGB', (600, 80), color='white')
+    draw = ImageDraw.Draw(image)
+    draw.text((10, 10), 'DISDERO LUMBER CO. D12345', fill='black')
+    draw.text((10, 40), '12 LF 224010-1000-C', fill='black')
+    return image
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark OCR backend per-call overhead')
+    parser.add_argument('--calls', type=int, default=50,
+                        help='OCR calls per backend')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=list(BACKENDS),
+                        help='Backends to compare')
+    args = parser.parse_args()
+
+    tesseract_path, _ = configure_tools()
+    image = make_image()
+
+    print(f"{'backend':<12} {'startup ms':>11} {'ms/call':>9}")
+    for name in args.backends:
+        try:
+            start = time.perf_counter()
+            backend = create_backend(name, tesseract_cmd=tesseract_path)
+            backend.image_to_string(image)
+            startup = time.perf_counter() - start
+        except ImportError as e:
+            print(f"{name:<12} not installed ({e})")
+            continue
+
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            backend.image_to_string(image)
+        per_call = (time.perf_counter() - start) / args.calls
+        backend.close()
+
+        print(f"{name:<12} {startup * 1000:>11.1f} {per_call * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
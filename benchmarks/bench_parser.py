@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for OCR text parsing
+Reports per-line parse cost for documents of increasing size, which should
+stay flat if parsing is linear in the number of lines
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Run from anywhere inside the repository
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.ocr_extractor import OCRExtractor
+
+
+def make_text(num_lines, seed=0):
+    """Build synthetic OCR text of about num_lines lines, four per product"""
+    rng = random.Random(seed)
+    lines = ["DISDERO LUMBER CO. D012345", ""]
+    while len(lines) < num_lines:
+        lines.append(f"{rng.randint(1, 999)} LF {rng.randint(100000, 999999)}-"
+                     f"{rng.randint(1000, 9999)}-HF DOUG FIR S4S")
+        lines.append(f"  {rng.randint(1, 4)}X{rng.choice([4, 6, 8, 10, 12])} KD")
+        dims = ", ".join(f"{rng.randint(1, 50)}/{rng.choice([8, 10, 12, 16, 20])}'"
+                         for _ in range(rng.randint(1, 3)))
+        lines.append(f"  {dims}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def bench(extractor, num_lines, repeat):
+    text = make_text(num_lines)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extractor.parse_document(text)
+        best = min(best, time.perf_counter() - start)
+    return best, text.count('\n') + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark OCR text parsing')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Document line counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Runs per size (best time is reported)')
+    args = parser.parse_args()
+
+    extractor = OCRExtractor(workers=1)
+    print(f"{'lines':>10} {'total ms':>12} {'us/line':>10}")
+    for size in args.sizes:
+        elapsed, num_lines = bench(extractor, size, args.repeat)
+        print(f"{num_lines:>10} {elapsed * 1000:>12.3f} {elapsed / num_lines * 1e6:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the whole pipeline on synthetic purchase orders
+Times each stage separately and end to end, and writes the results as JSON
+so runs from different commits can be compared with --compare
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+# Run from anywhere inside the repository
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytesseract
+from src.config import Config
+from src.excel_generator import ExcelGenerator
+from src.ocr_extractor import OCRExtractor
+from src.pdf_processor import PDFProcessor
+from src.pipeline import POPipeline
+from src.product_matcher import ProductMatcher
+from src.resource_usage import peak_rss_bytes
+from src.runtime_config import find_poppler, find_tesseract
+from synthetic_po import codes_by_product, make_po, render_pdf
+
+DEFAULT_CASES = ['1x10', '10x1000', '100x10000']
+STAGES = ['rasterize', 'ocr', 'parse', 'match', 'write', 'end_to_end']
+
+
+def parse_case(spec):
+    """Parse a PAGESxLINES case such as 10x1000"""
+    pages, _, lines = spec.lower().partition('x')
+    if not (pages.isdigit() and lines.isdigit() and int(pages) > 0):
+        raise argparse.ArgumentTypeError(f"expected PAGESxLINES, got '{spec}'")
+    return int(pages), int(lines)
+
+
+def git_commit():
+    """Short hash of the checked out commit, or None outside a git checkout"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=Path(__file__).resolve().parent)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+class Tools(NamedTuple):
+    """External tools found on this machine; each stage runs if the ones it needs are here"""
+    tesseract: bool
+    poppler: bool
+    poppler_path: Optional[str]  # Poppler bin directory, None when pdftoppm is on PATH
+
+    def missing(self):
+        """Which tools are missing, as a message, or an empty string"""
+        names = [name for name, found in (('Tesseract', self.tesseract), ('Poppler', self.poppler)) if not found]
+        return f"{' and '.join(names)} not found" if names else ''
+
+
+def find_tools():
+    """Look for Tesseract and Poppler separately, so one missing tool only skips its own stages"""
+    tesseract_path = find_tesseract()
+    if tesseract_path:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    poppler_path = find_poppler()
+    return Tools(
+        tesseract=tesseract_path is not None,
+        poppler=poppler_path is not None or shutil.which('pdftoppm') is not None,
+        poppler_path=poppler_path,
+    )
+
+
+def timed(func, *args, **kwargs):
+    """Call func, returning its result and the elapsed wall time in seconds"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_case(pages, line_items, args, lengths, matcher, tools, work_dir):
+    """Generate one synthetic PO and time every stage on it"""
+    po = make_po(pages, line_items, lengths)
+    pdf_path = Path(work_dir) / f"po_{pages}x{line_items}.pdf"
+    _, render_seconds = timed(render_pdf, po, str(pdf_path))
+
+    stages = {}
+    ocr_text = None
+    images = None
+    if tools.poppler:
+        pdf_processor = PDFProcessor(dpi=args.dpi, poppler_path=tools.poppler_path)
+        images, seconds = timed(pdf_processor.convert_pdf_to_images, str(pdf_path))
+        stages['rasterize'] = {'seconds': seconds}
+    else:
+        stages['rasterize'] = {'skipped': 'Poppler not found'}
+
+    if images is None or not tools.tesseract:
+        stages['ocr'] = {'skipped': 'Tesseract not found' if tools.poppler else 'Poppler not found'}
+    else:
+        # The OCR cache would turn repeat runs into lookups, so leave it off
+        ocr_extractor = OCRExtractor(workers=args.workers)
+        try:
+            ocr_text, seconds = timed(ocr_extractor.extract_text_from_pages, images)
+        finally:
+            ocr_extractor.close()
+        stages['ocr'] = {'seconds': seconds}
+    del images
+
+    # Without OCR, parse the text the PDF was rendered from
+    text = ocr_text if ocr_text is not None else '\n'.join(po.page_texts)
+    parsed_data, seconds = timed(OCRExtractor(workers=1).parse_document, text)
+    po_number, products = list(parsed_data.items())[0]
+    stages['parse'] = {'seconds': seconds, 'items': len(products)}
+
+    matched, seconds = timed(matcher.match_products, products)
+    stages['match'] = {'seconds': seconds, 'matched': sum(1 for p in matched if p.sku)}
+
+    _, seconds = timed(ExcelGenerator().generate_report, po_number, matched,
+                       str(Path(work_dir) / f"report_{pages}x{line_items}.xlsx"))
+    stages['write'] = {'seconds': seconds}
+
+    if not (tools.poppler and tools.tesseract):
+        stages['end_to_end'] = {'skipped': tools.missing()}
+    else:
+        pipeline = POPipeline(args.master_file, dpi=args.dpi, poppler_path=tools.poppler_path,
+                              ocr_workers=args.workers, ocr_cache=False, matcher=matcher)
+        try:
+            _, seconds = timed(pipeline.process, str(pdf_path), work_dir)
+        finally:
+            pipeline.close()
+        stages['end_to_end'] = {'seconds': seconds}
+
+    return {
+        'pages': pages,
+        'line_items': line_items,
+        'po_number': po.po_number,
+        'render_seconds': render_seconds,
+        'ocr_po_number_ok': po_number == po.po_number if ocr_text is not None else None,
+        'stages': stages,
+    }
+
+
+def print_case(case):
+    """Print one case's stage timings"""
+    print(f"\n{case['pages']} page(s), {case['line_items']} line item(s)")
+    for stage in STAGES:
+        result = case['stages'].get(stage)
+        if result is None:
+            continue
+        if 'skipped' in result:
+            print(f"  {stage:<11} skipped ({result['skipped']})")
+            continue
+        extra = ''.join(f"  {key}={value}" for key, value in result.items() if key != 'seconds')
+        print(f"  {stage:<11} {result['seconds'] * 1000:>12.1f} ms{extra}")
+
+
+def compare(baseline_file, results):
+    """Print per-stage timings of this run against a saved run"""
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    old_cases = {(c['pages'], c['line_items']): c for c in baseline['cases']}
+    print(f"\nCompared with {baseline_file} (commit {baseline.get('commit')})")
+    print(f"{'case':>12} {'stage':<11} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for case in results['cases']:
+        old_case = old_cases.get((case['pages'], case['line_items']))
+        if old_case is None:
+            continue
+        for stage in STAGES:
+            old = old_case['stages'].get(stage, {}).get('seconds')
+            new = case['stages'].get(stage, {}).get('seconds')
+            if old is None or new is None:
+                continue
+            ratio = new / old if old else float('inf')
+            flag = '  <-- slower' if ratio > 1.1 else ''
+            print(f"{case['pages']:>5}x{case['line_items']:<6} {stage:<11} "
+                  f"{old * 1000:>10.1f} {new * 1000:>10.1f} {ratio:>6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every pipeline stage on synthetic POs')
+    parser.add_argument('--cases', type=parse_case, nargs='+', default=[parse_case(c) for c in DEFAULT_CASES],
+                        metavar='PAGESxLINES', help=f"POs to generate (default: {' '.join(DEFAULT_CASES)})")
+    parser.add_argument('--master-file', default='productslist.xlsx',
+                        help='Path to master product list Excel file')
+    parser.add_argument('--dpi', type=int, default=Config.DEFAULT_DPI,
+                        help='DPI for PDF to image conversion')
+    parser.add_argument('--workers', type=int, default=Config.OCR_WORKERS,
+                        help='Processes for page-parallel OCR (default: one per CPU core)')
+    parser.add_argument('--output', metavar='FILE',
+                        help='JSON results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='Earlier JSON results to compare against')
+    parser.add_argument('--keep', metavar='DIR',
+                        help='Keep the generated PDFs and reports in DIR')
+    args = parser.parse_args()
+
+    tools = find_tools()
+    if tools.missing():
+        print(f"Warning: {tools.missing()}, stages that need it will be skipped")
+
+    matcher, master_seconds = timed(ProductMatcher, args.master_file)
+    lengths = codes_by_product(matcher.index)
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'dpi': args.dpi,
+        'workers': args.workers,
+        'master_load_seconds': master_seconds,
+        'cases': [],
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = args.keep or temp_dir
+        Path(work_dir).mkdir(parents=True, exist_ok=True)
+        for pages, line_items in args.cases:
+            case = run_case(pages, line_items, args, lengths, matcher, tools, work_dir)
+            results['cases'].append(case)
+            print_case(case)
+
+    results['peak_rss_bytes'] = peak_rss_bytes()
+
+    output = Path(args.output or Path(__file__).resolve().parent / 'results' / f"{commit or 'local'}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark image preprocessing presets against the raw-page OCR path
+Reports OCR time and parse success per preset on sample PO PDFs
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Run from anywhere inside the repository
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import Config
+from src.image_preprocessor import ImagePreprocessor
+from src.ocr_extractor import OCRExtractor
+from src.pdf_processor import PDFProcessor
+from src.runtime_config import configure_tools
+
+
+def bench_pdf(pdf_path, pages, preset):
+    """OCR and parse one PDF with a preset, returning (seconds, po_number, product count)"""
+    extractor = OCRExtractor(workers=1, preprocessor=ImagePreprocessor.from_preset(preset))
+    start = time.perf_counter()
+    text = extractor.extract_text_from_pages(pages)
+    elapsed = time.perf_counter() - start
+
+    po_number, products = list(extractor.parse_document(text).items())[0]
+    return elapsed, po_number, len(products)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark OCR preprocessing presets')
+    parser.add_argument('pdfs', nargs='+', help='Sample purchase order PDFs')
+    parser.add_argument('--dpi', type=int, default=Config.DEFAULT_DPI,
+                        help='DPI for PDF to image conversion')
+    parser.add_argument('--presets', nargs='+', default=list(Config.PREPROCESS_PRESETS),
+                        choices=list(Config.PREPROCESS_PRESETS),
+                        help='Presets to compare ("none" is the current path)')
+    args = parser.parse_args()
+
+    _, poppler_path = configure_tools()
+    processor = PDFProcessor(dpi=args.dpi, poppler_path=poppler_path)
+
+    totals = {preset: [0.0, 0] for preset in args.presets}
+    print(f"{'pdf':<30} {'preset':<8} {'seconds':>8} {'po':>10} {'products':>9}")
+    for pdf_path in args.pdfs:
+        # Rasterize once so only preprocessing + OCR is timed
+        pages = processor.convert_pdf_to_images(pdf_path)
+        for preset in args.presets:
+            elapsed, po_number, num_products = bench_pdf(pdf_path, pages, preset)
+            parsed = po_number != 'UNKNOWN' and num_products > 0
+            totals[preset][0] += elapsed
+            totals[preset][1] += parsed
+            print(f"{Path(pdf_path).name[:30]:<30} {preset:<8} {elapsed:>8.2f} {po_number:>10} {num_products:>9}")
+
+    print()
+    print(f"{'preset':<8} {'total s':>8} {'parsed':>8}")
+    for preset, (elapsed, parsed) in totals.items():
+        print(f"{preset:<8} {elapsed:>8.2f} {parsed:>5}/{len(args.pdfs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Synthetic Disdero-format purchase orders for benchmarks
+Builds the OCR text a PO should produce and renders it to an image-only PDF
+"""
+
+import math
+import random
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+# Run from anywhere inside the repository
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image, ImageDraw, ImageFont
+from src.po_parser import PRODUCT_CODE_RE
+
+SIZES = ['1X4', '1X6', '2X4', '2X6', '2X8', '2X10', '2X12', '4X4']
+DESCRIPTIONS = ['DOUG FIR S4S KD', 'HEM FIR #2 & BTR', 'WRC CLEAR VG S1S2E', 'PT SYP GC']
+
+# Most line items per product block; a block lists one dimension per line item
+MAX_DIMENSIONS_PER_BLOCK = 3
+
+
+class SyntheticPO(NamedTuple):
+    """A generated purchase order"""
+    po_number: str
+    page_texts: List[str]
+    line_items: int
+
+
+def codes_by_product(index) -> Dict[str, List[int]]:
+    """
+    Group a ProductMatcher index into the lengths each product code comes in
+
+    Args:
+        index: ProductMatcher.index
+
+    Returns:
+        Sorted lengths keyed by product code, for codes the parser can read
+    """
+    lengths = defaultdict(list)
+    for code, length in index:
+        if PRODUCT_CODE_RE.fullmatch(code):
+            lengths[code].append(length)
+    return {code: sorted(values) for code, values in lengths.items()}
+
+
+def make_po(pages: int, line_items: int, lengths: Dict[str, List[int]], seed: int = 0) -> SyntheticPO:
+    """
+    Generate the text of a PO, spreading its line items evenly over its pages
+
+    Args:
+        pages: Page count
+        line_items: Line items after expanding multi-dimension blocks
+        lengths: Output of codes_by_product
+        seed: Random seed, so the same case always produces the same PO
+
+    Returns:
+        SyntheticPO
+    """
+    rng = random.Random(seed)
+    codes = list(lengths)
+    po_number = f"D{rng.randint(100000, 999999)}"
+
+    # Split the line items into blocks, then deal the blocks out to pages
+    blocks = []
+    remaining = line_items
+    while remaining:
+        count = min(rng.randint(1, MAX_DIMENSIONS_PER_BLOCK), remaining)
+        code = rng.choice(codes)
+        dims = ", ".join(f"{rng.randint(1, 400)}/{rng.choice(lengths[code])}'" for _ in range(count))
+        blocks.append([
+            f"{rng.randint(1, 40)} LF {code} {rng.choice(DESCRIPTIONS)}",
+            f"  {rng.choice(SIZES)}  {dims}",
+        ])
+        remaining -= count
+
+    per_page = math.ceil(len(blocks) / pages) if blocks else 0
+    page_texts = []
+    for page in range(pages):
+        lines = [f"PURCHASE ORDER  PAGE {page + 1} OF {pages}"]
+        if page == 0:
+            lines += ["DISDERO LUMBER CO.", f"{po_number}", ""]
+        for block in blocks[page * per_page:(page + 1) * per_page]:
+            lines += block
+        page_texts.append('\n'.join(lines))
+
+    return SyntheticPO(po_number, page_texts, line_items)
+
+
+def render_pdf(po: SyntheticPO, pdf_path: str, dpi: int = 300):
+    """
+    Render a PO as a scanned-looking, image-only PDF (no text layer)
+
+    Args:
+        po: Generated PO
+        pdf_path: Output file path
+        dpi: Page resolution
+    """
+    width, height = int(8.5 * dpi), int(11 * dpi)
+    margin = dpi // 2
+    max_lines = max(len(text.split('\n')) for text in po.page_texts)
+    # Shrink the type on dense pages, but keep it at 10pt or below
+    line_height = min((height - 2 * margin) // max_lines, dpi * 14 // 72)
+    font = ImageFont.load_default(size=int(line_height * 0.7))
+
+    pages = []
+    for text in po.page_texts:
+        # 1-bit pages keep a 100 page PO to a few MB in memory
+        page = Image.new('1', (width, height), color=1)
+        draw = ImageDraw.Draw(page)
+        for row, line in enumerate(text.split('\n')):
+            draw.text((margin, margin + row * line_height), line, fill=0, font=font)
+        pages.append(page)
+
+    pages[0].save(pdf_path, save_all=True, append_images=pages[1:], resolution=dpi)
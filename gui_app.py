@@ -4,10 +4,17 @@ Purchase Order Processor - GUI Application
 A graphical interface for processing purchase order PDFs
 """
 
+import time
+
+# Taken first so time-to-window includes the imports below
+_START_TIME = time.perf_counter()
+
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 import threading
+import multiprocessing
 import sys
 import os
 import traceback
@@ -30,45 +37,85 @@ def get_resource_path(relative_path):
 # Add the src directory to path for imports
 sys.path.insert(0, get_resource_path('src'))
 
-# Import our modules
-from src.pdf_processor import PDFProcessor
-from src.ocr_extractor import OCRExtractor
-from src.product_matcher import ProductMatcher
-from src.excel_generator import ExcelGenerator
-from src.runtime_config import configure_tools
+# Import our modules. Only light ones here: pandas, PIL, pytesseract and
+# pdf2image are imported by the background warm-up once the window is up.
+from src.config import Config
 
-# Configure Tesseract and Poppler paths
-try:
-    TESSERACT_PATH, POPPLER_PATH = configure_tools()
-except Exception as e:
-    # Show error dialog if tools not found
-    import tkinter.messagebox as mb
 
-    detailed_error = f"""Tool Configuration Error:
-{str(e)}
+def run_in_background(func, *args):
+    """Run func on a daemon thread, returning a Future for its result"""
+    future = Future()
 
-System Information:
-- Python: {sys.executable}
-- Version: {sys.version}
-- Working Dir: {os.getcwd()}
+    def run():
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
 
-Please ensure Tesseract and Poppler are properly installed."""
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def warm_up_tools():
+    """Find Tesseract and Poppler and import the processing modules"""
+    from src.runtime_config import configure_tools
+
+    # Configure Tesseract and Poppler paths
+    tesseract_path, poppler_path = configure_tools()
+    import src.pipeline  # noqa: F401  (pulls in pandas, PIL, pytesseract, pdf2image)
+    return tesseract_path, poppler_path
 
-    mb.showerror("Configuration Error", detailed_error)
-    sys.exit(1)
+
+def load_matcher(master_file):
+    """Load the master product list"""
+    from src.product_matcher import ProductMatcher
+    return ProductMatcher(master_file)
+
+
+class Job:
+    """One PDF in the processing queue"""
+
+    def __init__(self, pdf_path):
+        self.pdf_path = pdf_path
+        self.status = "Queued"
+        self.pages_done = 0
+        self.total_pages = None
+        self.elapsed = None
+        self.result = ""
+        self.output_file = None
+        self.error = None
+        self.error_details = None
+        self.control = None
+        self.future = None
+
+    @property
+    def finished(self):
+        return self.status in ("Done", "Failed", "Cancelled")
 
 
 class POProcessorGUI:
+    LOADING_STATUS = "Loading OCR tools and master list..."
+
     def __init__(self, root):
         self.root = root
         self.root.title("Purchase Order Processor")
-        self.root.geometry("600x550")
+        self.root.geometry("720x760")
         self.root.resizable(False, False)
 
         # Variables
-        self.pdf_path = tk.StringVar()
         self._test_pdf_path = None  # Store for diagnostics
 
+        # Processing queue: jobs by tree item id, in the order they were added
+        self.jobs = {}
+        self._run_jobs = []  # Jobs submitted since the queue was last idle
+        self._executor = None
+        self._report_names = None  # Report names handed out in the current run
+        # One pipeline per option set, all sharing the preloaded master list and
+        # a single OCR extractor, so changing options never starts another worker pool
+        self._pipelines = {}
+        self._pipelines_lock = threading.Lock()
+        self._ocr_extractor = None
+
         # Use the resource path for the default master file
         default_master = get_resource_path("productslist.xlsx")
         if os.path.exists(default_master):
@@ -78,15 +125,88 @@ class POProcessorGUI:
             self.master_path = tk.StringVar(value="productslist.xlsx")
 
         self.output_path = tk.StringVar()
-        self.status_text = tk.StringVar(value="Ready")
+        self.status_text = tk.StringVar(value=self.LOADING_STATUS)
         self.progress_text = tk.StringVar()
 
+        # Filled in by the background warm-up
+        self.tesseract_path = None
+        self.poppler_path = None
+        self.startup_timings = {}
+        self._tools_future = None
+        self._matcher_future = None
+        self._matcher_file = None
+
         # Create GUI elements
         self.create_widgets()
 
         # Set default output directory
         self.output_path.set(str(Path.home() / "Desktop"))
 
+        # Runs once the event loop has started
+        self.root.after(0, self.on_window_shown)
+
+    def on_window_shown(self):
+        """Record time-to-window and start warming up in the background"""
+        # Flush pending geometry and drawing so the window is really on screen
+        self.root.update_idletasks()
+        self.startup_timings['window'] = time.perf_counter() - _START_TIME
+        print(f"Window shown after {self.startup_timings['window']:.2f}s")
+
+        warmup_start = time.perf_counter()
+        self._tools_future = run_in_background(warm_up_tools)
+        self.load_master_in_background(self.master_path.get())
+
+        def on_tools_ready(future):
+            self.startup_timings['warm_up'] = time.perf_counter() - warmup_start
+            self.root.after(0, lambda: self.finish_warm_up(future))
+
+        self._tools_future.add_done_callback(on_tools_ready)
+
+    def finish_warm_up(self, future):
+        """Take the tool paths from the warm-up, or explain why they're missing"""
+        error = future.exception()
+        if error is not None:
+            # Show error dialog if tools not found
+            detailed_error = f"""Tool Configuration Error:
+{str(error)}
+
+System Information:
+- Python: {sys.executable}
+- Version: {sys.version}
+- Working Dir: {os.getcwd()}
+
+Please ensure Tesseract and Poppler are properly installed."""
+
+            messagebox.showerror("Configuration Error", detailed_error)
+            self.root.destroy()
+            return
+
+        from src.runtime_config import last_discovery
+
+        self.tesseract_path, self.poppler_path = future.result()
+        self.startup_timings['tool_discovery'] = last_discovery.get('seconds')
+        self.startup_timings['tools_cached'] = last_discovery.get('cached')
+        print(f"Warm-up finished after {self.startup_timings['warm_up']:.2f}s")
+        if self.status_text.get() == self.LOADING_STATUS:
+            self.status_text.set("Ready")
+
+    def load_master_in_background(self, master_file):
+        """Start loading a master list so it's ready by the time a PDF is picked"""
+        self._matcher_file = master_file
+        self._matcher_future = None
+        if os.path.exists(master_file):
+            self._matcher_future = run_in_background(load_matcher, master_file)
+
+    def get_matcher(self, master_file):
+        """Preloaded matcher for master_file, or None to let the pipeline load it"""
+        if self._matcher_future is None or self._matcher_file != master_file:
+            return None
+        try:
+            return self._matcher_future.result()
+        except Exception:
+            # Load it again in the pipeline so the error is reported there
+            return None
+
     def create_widgets(self):
         # Title
         title_frame = tk.Frame(self.root, bg="#2c3e50", height=60)
@@ -106,23 +226,37 @@ class POProcessorGUI:
         main_frame = tk.Frame(self.root, padx=20, pady=20)
         main_frame.pack(fill="both", expand=True)
 
-        # Input PDF Selection
-        input_frame = tk.LabelFrame(main_frame, text="Input PDF", padx=10, pady=10)
-        input_frame.pack(fill="x", pady=(0, 10))
-
-        tk.Entry(
-            input_frame,
-            textvariable=self.pdf_path,
-            width=50,
-            state="readonly"
-        ).pack(side="left", padx=(0, 10))
-
-        tk.Button(
-            input_frame,
-            text="Browse",
-            command=self.browse_pdf,
-            width=10
-        ).pack(side="left")
+        # PDF Queue
+        queue_frame = tk.LabelFrame(main_frame, text="Purchase Order PDFs", padx=10, pady=10)
+        queue_frame.pack(fill="x", pady=(0, 10))
+
+        tree_frame = tk.Frame(queue_frame)
+        tree_frame.pack(fill="x")
+
+        columns = ("file", "status", "pages", "time", "result")
+        self.job_tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=7)
+        for column, heading, width in (
+            ("file", "File", 220), ("status", "Status", 80), ("pages", "Pages", 60),
+            ("time", "Time", 60), ("result", "Result", 200),
+        ):
+            self.job_tree.heading(column, text=heading)
+            self.job_tree.column(column, width=width, anchor="w" if column in ("file", "result") else "center")
+
+        tree_scrollbar = tk.Scrollbar(tree_frame, orient="vertical", command=self.job_tree.yview)
+        self.job_tree.configure(yscrollcommand=tree_scrollbar.set)
+        self.job_tree.pack(side="left", fill="x", expand=True)
+        tree_scrollbar.pack(side="right", fill="y")
+
+        queue_buttons = tk.Frame(queue_frame)
+        queue_buttons.pack(fill="x", pady=(10, 0))
+
+        for text, command in (
+            ("Add PDFs", self.browse_pdf),
+            ("Remove", self.remove_selected),
+            ("Cancel Selected", self.cancel_selected),
+            ("Clear Finished", self.clear_finished),
+        ):
+            tk.Button(queue_buttons, text=text, command=command, width=14).pack(side="left", padx=(0, 5))
 
         # Master File Selection
         master_frame = tk.LabelFrame(main_frame, text="Master Product List", padx=10, pady=10)
@@ -174,7 +308,15 @@ class POProcessorGUI:
             textvariable=self.dpi_var,
             width=10
         )
-        dpi_spinbox.pack(side="left", padx=(0, 20))
+        dpi_spinbox.pack(side="left", padx=(0, 10))
+
+        # Adaptive mode starts at 150 DPI and only re-runs pages that fail to parse
+        self.adaptive_dpi_var = tk.BooleanVar(value=Config.ADAPTIVE_DPI)
+        tk.Checkbutton(
+            options_frame,
+            text="Adaptive",
+            variable=self.adaptive_dpi_var
+        ).pack(side="left", padx=(0, 10))
 
         tk.Label(options_frame, text="(Higher DPI = better quality but slower)").pack(side="left")
 
@@ -185,7 +327,7 @@ class POProcessorGUI:
         # Process Button
         self.process_btn = tk.Button(
             button_frame,
-            text="Process PDF",
+            text="Process Queue",
             command=self.process_pdf,
             height=2,
             width=18,
@@ -213,7 +355,8 @@ class POProcessorGUI:
         # Progress Bar
         self.progress_bar = ttk.Progressbar(
             main_frame,
-            mode="indeterminate",
+            mode="determinate",
+            maximum=100,
             length=400
         )
         self.progress_bar.pack(pady=(10, 10))
@@ -242,14 +385,84 @@ class POProcessorGUI:
         status_label.pack(fill="both", expand=True)
 
     def browse_pdf(self):
-        filename = filedialog.askopenfilename(
-            title="Select Purchase Order PDF",
+        filenames = filedialog.askopenfilenames(
+            title="Select Purchase Order PDFs",
             filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")]
         )
-        if filename:
-            self.pdf_path.set(filename)
-            self._test_pdf_path = filename  # Store for diagnostics
-            self.status_text.set(f"Selected: {Path(filename).name}")
+        if filenames:
+            queued = {job.pdf_path for job in self.jobs.values() if not job.finished}
+            for filename in filenames:
+                if filename not in queued:
+                    self.add_job(filename)
+            self._test_pdf_path = filenames[0]  # Store for diagnostics
+            self.status_text.set(f"Added {len(filenames)} PDF(s) to the queue")
+
+    def add_job(self, pdf_path):
+        """Add a PDF to the bottom of the queue"""
+        job = Job(pdf_path)
+        item = self.job_tree.insert("", "end", values=self.job_values(job))
+        self.jobs[item] = job
+
+    def job_values(self, job):
+        """Tree row for a job"""
+        if job.total_pages:
+            pages = f"{job.pages_done}/{job.total_pages}"
+        else:
+            pages = str(job.pages_done) if job.pages_done else ""
+        elapsed = f"{job.elapsed:.1f}s" if job.elapsed is not None else ""
+        return (Path(job.pdf_path).name, job.status, pages, elapsed, job.result)
+
+    def refresh_job(self, item):
+        """Redraw a job's row and the overall progress bar"""
+        if item in self.jobs and self.job_tree.exists(item):
+            self.job_tree.item(item, values=self.job_values(self.jobs[item]))
+        self.update_overall_progress()
+
+    def update_overall_progress(self):
+        """Fill the progress bar with the share of pages done across the current run"""
+        if not self._run_jobs:
+            self.progress_bar["value"] = 0
+            return
+
+        done = 0.0
+        for job in self._run_jobs:
+            if job.finished:
+                done += 1
+            elif job.total_pages:
+                done += job.pages_done / job.total_pages
+        self.progress_bar["value"] = 100 * done / len(self._run_jobs)
+
+    def remove_selected(self):
+        """Drop selected jobs that aren't waiting in the pool or running"""
+        for item in self.job_tree.selection():
+            job = self.jobs[item]
+            if job.finished or job.future is None:
+                self.job_tree.delete(item)
+                del self.jobs[item]
+
+    def cancel_selected(self):
+        """Cancel selected jobs, whether still queued or already running"""
+        for item in self.job_tree.selection():
+            job = self.jobs[item]
+            if job.finished:
+                continue
+            if job.future is None or job.future.cancel():
+                # Never started, so nothing to interrupt
+                job.status = "Cancelled"
+                job.result = ""
+                if job in self._run_jobs:
+                    self.job_finished(item)
+            else:
+                job.control.cancel()
+                job.status = "Cancelling"
+            self.refresh_job(item)
+
+    def clear_finished(self):
+        """Remove finished jobs from the list"""
+        for item, job in list(self.jobs.items()):
+            if job.finished and job not in self._run_jobs:
+                self.job_tree.delete(item)
+                del self.jobs[item]
 
     def browse_master(self):
         filename = filedialog.askopenfilename(
@@ -259,6 +472,7 @@ class POProcessorGUI:
         if filename:
             self.master_path.set(filename)
             self.status_text.set(f"Master file: {Path(filename).name}")
+            self.load_master_in_background(filename)
 
     def browse_output(self):
         directory = filedialog.askdirectory(
@@ -296,7 +510,15 @@ class POProcessorGUI:
         log(f"Python Version: {sys.version}")
         log(f"Platform: {platform.platform()}")
         log(f"Architecture: {platform.architecture()}")
-        log(f"Working Directory: {os.getcwd()}\n")
+        log(f"Working Directory: {os.getcwd()}")
+        if 'window' in self.startup_timings:
+            log(f"Time to Window: {self.startup_timings['window']:.2f}s")
+        if 'warm_up' in self.startup_timings:
+            log(f"Background Warm-up: {self.startup_timings['warm_up']:.2f}s")
+        if self.startup_timings.get('tool_discovery') is not None:
+            cached = " (cached)" if self.startup_timings['tools_cached'] else ""
+            log(f"Tool Discovery: {self.startup_timings['tool_discovery'] * 1000:.1f} ms{cached}")
+        log("")
 
         # Tool detection
         log("=== TOOL DETECTION ===")
@@ -375,6 +597,9 @@ class POProcessorGUI:
         log("\n=== PDF PROCESSING TEST ===")
         if hasattr(self, '_test_pdf_path') and self._test_pdf_path and os.path.exists(self._test_pdf_path):
             try:
+                from src.pdf_processor import PDFProcessor
+                from src.ocr_extractor import OCRExtractor
+
                 pdf_processor = PDFProcessor(dpi=150, poppler_path=poppler_path)
 
                 log("Testing PDF conversion...")
@@ -423,12 +648,9 @@ class POProcessorGUI:
 
     def process_pdf(self):
         # Validate inputs
-        if not self.pdf_path.get():
-            messagebox.showerror("Error", "Please select a PDF file")
-            return
-
-        if not Path(self.pdf_path.get()).exists():
-            messagebox.showerror("Error", "Selected PDF file does not exist")
+        pending = [item for item, job in self.jobs.items() if job.status == "Queued" and job.future is None]
+        if not pending:
+            messagebox.showerror("Error", "Please add PDF files to the queue")
             return
 
         if not Path(self.master_path.get()).exists():
@@ -439,80 +661,150 @@ class POProcessorGUI:
             messagebox.showerror("Error", "Please select an output directory")
             return
 
-        # Disable button during processing
-        self.process_btn.config(state="disabled", bg="#95a5a6")
-
-        # Start processing in a separate thread
-        thread = threading.Thread(target=self.process_pdf_thread)
-        thread.daemon = True
-        thread.start()
+        from src.pipeline import JobControl, ReportNames
+
+        # Options are fixed per job when it's submitted
+        options = (self.master_path.get(), self.dpi_var.get(), self.adaptive_dpi_var.get())
+        output_dir = self.output_path.get()
+
+        if self._executor is None:
+            # Each job OCRs its pages in parallel too, so only a few run at once
+            self._executor = ThreadPoolExecutor(max_workers=Config.GUI_JOBS)
+        if not self._run_jobs:
+            # Jobs added while a run is going share its names, so same-PO reports can't collide
+            self._report_names = ReportNames()
+
+        for item in pending:
+            job = self.jobs[item]
+            if not Path(job.pdf_path).exists():
+                job.status = "Failed"
+                job.result = "File not found"
+                self.refresh_job(item)
+                continue
+
+            job.control = JobControl(on_page=lambda done, total, item=item: self.on_page(item, done, total))
+            job.future = self._executor.submit(self.process_pdf_thread, item, options, output_dir,
+                                               self._report_names)
+            self._run_jobs.append(job)
+
+        self.status_text.set(f"Processing {len(self._run_jobs)} PDF(s)...")
+        self.update_overall_progress()
+
+    def get_pipeline(self, options):
+        """Pipeline for a set of options, created on first use and shared by later jobs"""
+        from src.pipeline import POPipeline
+
+        with self._pipelines_lock:
+            pipeline = self._pipelines.get(options)
+            if pipeline is None:
+                master_file, dpi, adaptive_dpi = options
+                _, poppler_path = self._tools_future.result()
+                if self._ocr_extractor is None:
+                    self._ocr_extractor = POPipeline.create_ocr_extractor()
+
+                # Embedded text is tried first, rasterization and OCR only run as a fallback
+                pipeline = POPipeline(
+                    master_file,
+                    dpi=dpi,
+                    poppler_path=poppler_path,
+                    adaptive_dpi=adaptive_dpi,
+                    matcher=self.get_matcher(master_file),
+                    ocr_extractor=self._ocr_extractor
+                )
+                self._pipelines[options] = pipeline
+            return pipeline
+
+    def process_pdf_thread(self, item, options, output_dir, report_names):
+        """Process one queued job on a worker thread"""
+        from src.pipeline import ProcessingCancelled
+
+        job = self.jobs[item]
+        if job.control.cancelled:
+            job.status = "Cancelled"
+            self.root.after(0, self.job_finished, item)
+            return
 
-    def process_pdf_thread(self):
+        job.status = "Running"
+        self.root.after(0, self.refresh_job, item)
+        start = time.perf_counter()
         try:
-            # Start progress bar
-            self.progress_bar.start(10)
-
-            # Step 1: Convert PDF to images (pass poppler_path if needed)
-            self.update_progress("Converting PDF to images...")
-            pdf_processor = PDFProcessor(dpi=self.dpi_var.get(), poppler_path=POPPLER_PATH)
-            images = pdf_processor.convert_pdf_to_images(self.pdf_path.get())
-
-            # Step 2: Combine images and perform OCR
-            self.update_progress("Performing OCR (this may take a moment)...")
-            ocr_extractor = OCRExtractor()
-            combined_image = pdf_processor.combine_images_vertically(images)
-            ocr_text = ocr_extractor.extract_text(combined_image)
-
-            # Step 3: Parse OCR results
-            self.update_progress("Parsing document...")
-            parsed_data = ocr_extractor.parse_document(ocr_text)
-
-            # Step 4: Match products with master list
-            self.update_progress("Matching products...")
-            matcher = ProductMatcher(self.master_path.get())
-            po_number, products = list(parsed_data.items())[0]
-            matched_products = matcher.match_products(products)
-
-            # Step 5: Generate Excel report
-            self.update_progress(f"Generating Excel report for PO #{po_number}...")
-            excel_gen = ExcelGenerator()
-            output_file = Path(self.output_path.get()) / f"Disdero #{po_number}.xlsx"
-            excel_gen.generate_report(po_number, matched_products, str(output_file))
-
-            # Clean up
-            pdf_processor.cleanup_temp_files()
-
-            # Stop progress bar
-            self.progress_bar.stop()
-
-            # Show success message
-            self.root.after(0, lambda: self.show_success(output_file, po_number))
-
+            # Wait for the warm-up if the user was quicker than it
+            self.post_progress(item, "Finishing startup...")
+            pipeline = self.get_pipeline(options)
+            po_number, output_file = pipeline.process(
+                job.pdf_path,
+                output_dir,
+                progress=lambda message: self.post_progress(item, message),
+                control=job.control,
+                report_names=report_names
+            )
+            job.status = "Done"
+            job.output_file = output_file
+            job.result = f"PO #{po_number} -> {output_file.name}"
+        except ProcessingCancelled:
+            job.status = "Cancelled"
+            job.result = ""
         except Exception as e:
-            # Stop progress bar
-            self.progress_bar.stop()
+            job.status = "Failed"
+            job.error = e
+            job.error_details = traceback.format_exc()
+            job.result = str(e).split("\n")[0]
+        finally:
+            job.elapsed = time.perf_counter() - start
+            self.root.after(0, self.job_finished, item)
+
+    def on_page(self, item, done, total):
+        """Page progress from a worker thread"""
+        job = self.jobs[item]
+        job.pages_done, job.total_pages = done, total
+        self.root.after(0, self.refresh_job, item)
+
+    def post_progress(self, item, message):
+        """Show a job's stage message, from any thread"""
+        name = Path(self.jobs[item].pdf_path).name
+        self.root.after(0, self.update_progress, f"{name}: {message}")
+
+    def job_finished(self, item):
+        """Record a finished job and report once the whole run is done"""
+        self.refresh_job(item)
+        if not all(job.finished for job in self._run_jobs):
+            return
 
-            # Enhanced error reporting with option to run diagnostics
-            self.root.after(0, lambda: self.show_error_with_diagnostics(e))
+        run_jobs, self._run_jobs = self._run_jobs, []
+        self.update_progress("")
+        self.update_overall_progress()
+
+        done = [job for job in run_jobs if job.status == "Done"]
+        failed = [job for job in run_jobs if job.status == "Failed"]
+        cancelled = len(run_jobs) - len(done) - len(failed)
+        self.status_text.set(
+            f"Processed {len(run_jobs)} PDF(s): {len(done)} done, "
+            f"{len(failed)} failed, {cancelled} cancelled"
+        )
 
-        finally:
-            # Re-enable button
-            self.root.after(0, lambda: self.process_btn.config(state="normal", bg="#27ae60"))
+        if failed:
+            self.show_error_with_diagnostics(failed)
+        elif done:
+            self.show_success(done)
 
-    def show_error_with_diagnostics(self, error):
-        """Show error with option to run diagnostics"""
+    def show_error_with_diagnostics(self, failed_jobs):
+        """Show errors with option to run diagnostics"""
         # Save detailed error log
-        error_details = f"""Error processing PDF: {str(error)}
+        error_details = f"""Error processing {len(failed_jobs)} PDF(s)
 
-Error Type: {type(error).__name__}
-PDF File: {self.pdf_path.get()}
 Master File: {self.master_path.get()}
 Python Version: {sys.version}
 Working Directory: {os.getcwd()}
 Platform: {platform.platform()}
+"""
+        for job in failed_jobs:
+            error_details += f"""
+PDF File: {job.pdf_path}
+Error Type: {type(job.error).__name__ if job.error else "n/a"}
+Error: {job.error}
 
 Full Traceback:
-{traceback.format_exc()}
+{job.error_details or job.result}
 """
 
         try:
@@ -522,46 +814,66 @@ Full Traceback:
             pass  # Don't fail on logging failure
 
         # Show error message with diagnostic option
+        summary = "\n".join(f"{Path(job.pdf_path).name}: {job.result}" for job in failed_jobs[:5])
+        if len(failed_jobs) > 5:
+            summary += f"\n... and {len(failed_jobs) - 5} more"
         result = messagebox.askyesno(
             "Processing Error",
-            f"An error occurred during processing:\n\n{str(error)}\n\n" +
+            f"{len(failed_jobs)} PDF(s) could not be processed:\n\n{summary}\n\n" +
             "Error details have been saved to error_log.txt\n\n" +
             "Would you like to run system diagnostics to help identify the issue?"
         )
 
-        self.update_progress("")
-        self.status_text.set("Error occurred during processing")
-
         if result:
             self.run_diagnostics()
 
     def update_progress(self, message):
         self.progress_text.set(message)
-        self.root.update_idletasks()
 
-    def show_success(self, output_file, po_number):
-        self.update_progress("")
-        self.status_text.set(f"Successfully processed PO #{po_number}")
+    def show_success(self, done_jobs):
+        output_dir = done_jobs[-1].output_file.parent
+        if len(done_jobs) == 1:
+            message = f"Report generated successfully!\n\n{done_jobs[0].result}"
+        else:
+            message = f"{len(done_jobs)} reports generated successfully!"
 
         result = messagebox.askyesno(
             "Success",
-            f"Report generated successfully!\n\nPO Number: {po_number}\nFile: {output_file.name}\n\nWould you like to open the output folder?"
+            f"{message}\n\nWould you like to open the output folder?"
         )
 
         if result:
             # Open the output folder in file explorer
             if platform.system() == 'Windows':
-                subprocess.Popen(['explorer', str(output_file.parent)])
+                subprocess.Popen(['explorer', str(output_dir)])
             elif platform.system() == 'Darwin':  # macOS
-                subprocess.Popen(['open', str(output_file.parent)])
+                subprocess.Popen(['open', str(output_dir)])
             else:  # Linux
-                subprocess.Popen(['xdg-open', str(output_file.parent)])
+                subprocess.Popen(['xdg-open', str(output_dir)])
+
+    def on_close(self):
+        """Cancel every job and close the window"""
+        for job in self.jobs.values():
+            if job.control is not None:
+                job.control.cancel()
+        self.root.destroy()
+
+    def shutdown(self):
+        """Wait for running jobs to stop, then release the OCR worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._ocr_extractor is not None:
+            self._ocr_extractor.close()
 
 
 def main():
+    # Required for the OCR process pool in the PyInstaller build
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = POProcessorGUI(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
+    app.shutdown()
 
 
 if __name__ == "__main__":
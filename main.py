@@ -5,62 +5,225 @@ Main entry point for the application
 """
 
 import argparse
+import glob
+import multiprocessing
+import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
 from pathlib import Path
-from src.pdf_processor import PDFProcessor
-from src.ocr_extractor import OCRExtractor
-from src.product_matcher import ProductMatcher
-from src.excel_generator import ExcelGenerator
+from src.pipeline import POPipeline, ReportNames
+from src.excel_generator import ConsolidatedReport
+from src.instrumentation import RunMetrics
 from src.config import Config
+from src.ocr_backends import BACKENDS
+
+
+def collect_pdfs(batch_spec):
+    """Expand a --batch directory or glob pattern into a sorted list of PDFs"""
+    if os.path.isdir(batch_spec):
+        return sorted(str(p) for p in Path(batch_spec).iterdir()
+                      if p.is_file() and p.suffix.lower() == '.pdf')
+    return sorted(glob.glob(batch_spec, recursive=True))
+
+
+def build_pipeline(args, ocr_workers, poppler_path=None):
+    """Create the pipeline from the command line options, loading the master list"""
+    return POPipeline(
+        args.master_file,
+        dpi=args.dpi,
+        poppler_path=poppler_path,
+        ocr_workers=ocr_workers,
+        use_text_layer=not args.no_text_layer,
+        stream_pages=args.stream,
+        debug_dir=args.debug_images,
+        preprocess=args.preprocess,
+        region_ocr=args.regions,
+        ocr_cache=Config.OCR_CACHE_ENABLED and not args.no_ocr_cache,
+        ocr_backend=args.ocr_backend,
+        adaptive_dpi=args.adaptive_dpi,
+        metrics_log=args.metrics_log
+    )
+
+
+def run_batch(pipeline, pdf_paths, output_dir, jobs, report=None, show_metrics=False):
+    """Process many PDFs through a worker pool and print a summary (into one workbook if report is given)"""
+    report_names = ReportNames()
+
+    def process_one(pdf_path):
+        start = time.perf_counter()
+        metrics = RunMetrics(pdf_path)
+        try:
+            if report is not None:
+                po_number, location = pipeline.process_into(pdf_path, report, metrics=metrics)
+                output_file = f"{Path(location.output_file).name} [{location.sheet_name}]"
+            else:
+                po_number, output_file = pipeline.process(pdf_path, output_dir, metrics=metrics,
+                                                          report_names=report_names)
+            return pdf_path, output_file, None, time.perf_counter() - start
+        except Exception as e:
+            return pdf_path, None, e, time.perf_counter() - start
+        finally:
+            if show_metrics:
+                print(metrics.to_json())
+
+    results = []
+    batch_start = time.perf_counter()
+
+    # Tesseract and Poppler run as subprocesses, so threads process files in parallel
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(process_one, pdf_path) for pdf_path in pdf_paths]
+        for future in as_completed(futures):
+            result = future.result()
+            pdf_path, output_file, error, elapsed = result
+            status = "✓" if error is None else "✗"
+            print(f"{status} {Path(pdf_path).name} ({elapsed:.2f}s)")
+            results.append(result)
+
+    failures = [r for r in results if r[2] is not None]
+    total = time.perf_counter() - batch_start
+
+    print()
+    print(f"Processed {len(results)} PDF(s) in {total:.2f}s: "
+          f"{len(results) - len(failures)} succeeded, {len(failures)} failed")
+    for pdf_path, output_file, error, elapsed in sorted(results, key=lambda r: r[0]):
+        if error is None:
+            print(f"  OK    {elapsed:7.2f}s  {Path(pdf_path).name} -> {output_file}")
+        else:
+            print(f"  FAIL  {elapsed:7.2f}s  {Path(pdf_path).name}: {error}")
+
+    return not failures
+
+
+def run_server(args):
+    """Keep one warm pipeline and serve it over HTTP until interrupted"""
+    from src.runtime_config import configure_tools
+    from src.server import POService, serve
+
+    poppler_path = None
+    try:
+        _, poppler_path = configure_tools()
+    except Exception as e:
+        print(f"Warning: {e}")
+
+    # Files run in parallel, so each only needs one OCR worker unless asked otherwise
+    pipeline = build_pipeline(args, ocr_workers=args.workers or 1, poppler_path=poppler_path)
+    service = POService(pipeline, args.master_file, jobs=args.jobs, queue_size=args.queue_size)
+    service.warm_up()
+    serve(service, args.host, args.port)
 
 
 def main():
     parser = argparse.ArgumentParser(description='Process purchase order PDFs and generate Excel reports')
-    parser.add_argument('pdf_path', help='Path to the purchase order PDF')
+    parser.add_argument('pdf_path', nargs='?', help='Path to the purchase order PDF')
+    parser.add_argument('--batch', metavar='DIR_OR_GLOB',
+                        help='Process every PDF in a directory or matching a glob pattern')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help='PDFs processed concurrently in batch or serve mode (default: one per CPU core)')
+    parser.add_argument('--serve', action='store_true',
+                        help='Run a local HTTP service that keeps the pipeline warm between POs')
+    parser.add_argument('--host', default=Config.SERVER_HOST,
+                        help=f'Interface the service listens on (default: {Config.SERVER_HOST}, this machine only)')
+    parser.add_argument('--port', type=int, default=Config.SERVER_PORT,
+                        help=f'Port the service listens on (default: {Config.SERVER_PORT})')
+    parser.add_argument('--queue-size', type=int, default=Config.SERVER_QUEUE_SIZE,
+                        help='Uploads that may wait for a worker before the service answers 503')
+    parser.add_argument('--combined', nargs='?', metavar='FILE', const='',
+                        help='In batch mode, write every PO as a sheet of one workbook with an '
+                             'index sheet (default name: "Disdero batch <date>.xlsx" in --output-dir)')
     parser.add_argument('--master-file', default='productslist.xlsx',
                         help='Path to master product list Excel file')
     parser.add_argument('--output-dir', default='output',
                         help='Directory for output files')
     parser.add_argument('--dpi', type=int, default=300,
                         help='DPI for PDF to image conversion')
+    parser.add_argument('--adaptive-dpi', action='store_true', default=Config.ADAPTIVE_DPI,
+                        help=f'OCR at {min(Config.DPI_TIERS)} DPI first and re-rasterize only pages '
+                             f'that fail to parse (overrides --dpi and --regions)')
+    parser.add_argument('--workers', type=int, default=Config.OCR_WORKERS,
+                        help='Processes for page-parallel OCR (default: one per CPU core, '
+                             'or 1 in batch mode where files run in parallel)')
+    parser.add_argument('--no-text-layer', action='store_true',
+                        help='Always OCR, even when the PDF has an embedded text layer')
+    parser.add_argument('--stream', action='store_true', default=Config.STREAM_PAGES,
+                        help='Rasterize a few pages at a time to keep memory flat on long POs')
+    parser.add_argument('--debug-images', metavar='DIR', default=Config.DEBUG_IMAGES_DIR,
+                        help='Save rasterized page images under DIR for debugging')
+    parser.add_argument('--preprocess', choices=list(Config.PREPROCESS_PRESETS), default=Config.PREPROCESS,
+                        help='Image cleanup applied to each page before OCR')
+    parser.add_argument('--regions', action='store_true', default=Config.REGION_OCR,
+                        help='OCR only the PO header and line-item table, falling back to full pages')
+    parser.add_argument('--no-ocr-cache', action='store_true',
+                        help='Always run tesseract instead of reusing cached text for repeat pages')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Print per-stage timing and memory for each PDF as a JSON line')
+    parser.add_argument('--metrics-log', metavar='FILE', default=Config.METRICS_LOG,
+                        help='Append per-stage timing and memory for each PDF to FILE (JSON Lines)')
+    parser.add_argument('--ocr-backend', choices=['auto'] + list(BACKENDS), default=Config.OCR_BACKEND,
+                        help='OCR engine; tesserocr keeps tesseract loaded instead of spawning it per page')
     args = parser.parse_args()
 
+    if args.serve:
+        if args.pdf_path or args.batch:
+            parser.error('--serve takes no pdf_path or --batch')
+        try:
+            run_server(args)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if bool(args.pdf_path) == bool(args.batch):
+        parser.error('provide either pdf_path or --batch')
+    if args.combined is not None and not args.batch:
+        parser.error('--combined requires --batch')
+
     # Create output directory if it doesn't exist
     output_dir = Path(args.output_dir)
     output_dir.mkdir(exist_ok=True)
 
-    try:
-        # Step 1: Convert PDF to images
-        print(f"Converting PDF: {args.pdf_path}")
-        pdf_processor = PDFProcessor(dpi=args.dpi)
-        images = pdf_processor.convert_pdf_to_images(args.pdf_path)
-
-        # Step 2: Combine images and perform OCR
-        print("Performing OCR...")
-        ocr_extractor = OCRExtractor()
-        combined_image = pdf_processor.combine_images_vertically(images)
-        ocr_text = ocr_extractor.extract_text(combined_image)
-
-        # Step 3: Parse OCR results
-        print("Parsing document...")
-        parsed_data = ocr_extractor.parse_document(ocr_text)
-
-        # Step 4: Match products with master list
-        print("Matching products...")
-        matcher = ProductMatcher(args.master_file)
-        po_number, products = list(parsed_data.items())[0]
-        matched_products = matcher.match_products(products)
-
-        # Step 5: Generate Excel report
-        print(f"Generating Excel report for PO #{po_number}")
-        excel_gen = ExcelGenerator()
-        output_file = output_dir / f"Disdero #{po_number}.xlsx"
-        excel_gen.generate_report(po_number, matched_products, str(output_file))
+    if args.batch:
+        pdf_paths = collect_pdfs(args.batch)
+        if not pdf_paths:
+            print(f"Error: No PDF files found for {args.batch}", file=sys.stderr)
+            sys.exit(1)
 
-        print(f"✓ Report generated successfully: {output_file}")
+        try:
+            # Load the master list once for the whole batch
+            pipeline = build_pipeline(args, ocr_workers=args.workers or 1)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        report = None
+        if args.combined is not None:
+            report = ConsolidatedReport(str(args.combined or output_dir / f"Disdero batch {date.today()}.xlsx"))
 
-        # Clean up temporary image files
-        pdf_processor.cleanup_temp_files()
+        print(f"Processing {len(pdf_paths)} PDF(s) with {args.jobs} job(s)...")
+        try:
+            succeeded = run_batch(pipeline, pdf_paths, str(output_dir), args.jobs, report, args.metrics)
+        finally:
+            pipeline.close()
+            if report is not None:
+                report.close()
+                for output_file in report.output_files:
+                    print(f"Combined workbook: {output_file}")
+        if not succeeded:
+            sys.exit(1)
+        return
+
+    try:
+        pipeline = build_pipeline(args, ocr_workers=args.workers)
+        metrics = RunMetrics(args.pdf_path)
+        try:
+            po_number, output_file = pipeline.process(args.pdf_path, str(output_dir), progress=print,
+                                                      metrics=metrics)
+        finally:
+            pipeline.close()
+            if args.metrics:
+                print(metrics.to_json())
+        print(f"✓ Report generated successfully: {output_file}")
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -68,4 +231,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    multiprocessing.freeze_support()
+    main()
@@ -6,16 +6,35 @@ A Python package for processing purchase order PDFs and generating Excel reports
 __version__ = "1.0.0"
 __author__ = "Your Name"
 
-from .pdf_processor import PDFProcessor
-from .ocr_extractor import OCRExtractor
-from .product_matcher import ProductMatcher
-from .excel_generator import ExcelGenerator
-from .config import Config
+import importlib
+
+# Public names and the submodule defining each. They are imported on first
+# access so that importing a light module such as src.config doesn't pull
+# in pandas, PIL and pytesseract.
+_EXPORTS = {
+    'PDFProcessor': 'pdf_processor',
+    'OCRExtractor': 'ocr_extractor',
+    'ProductMatcher': 'product_matcher',
+    'ExcelGenerator': 'excel_generator',
+    'Config': 'config',
+    'LineItem': 'line_items',
+    'LineItemBatch': 'line_items',
+}
 
 __all__ = [
     'PDFProcessor',
     'OCRExtractor',
     'ProductMatcher',
     'ExcelGenerator',
-    'Config'
-]
\ No newline at end of file
+    'Config',
+    'LineItem',
+    'LineItemBatch'
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,208 @@
+"""
+Product Code Index Module
+Finds the master product code closest to an OCR misread one
+"""
+
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+from .config import Config
+
+# Characters tesseract reads in place of digits, and the digit each one stands
+# for; Config.OCR_DIGIT accepts the same characters in product codes
+LETTER_TO_DIGIT = str.maketrans(Config.OCR_DIGIT_LOOKALIKES)
+# Digits read in place of letters in the alphabetic suffix
+DIGIT_TO_LETTER = str.maketrans("01586", "OISBG")
+
+# Substitution costs for characters tesseract confuses; any other substitution,
+# insertion or deletion costs 1
+OCR_CONFUSIONS = {
+    # Letters and digits that look alike
+    ("0", "O"): 0.1, ("0", "o"): 0.1, ("0", "D"): 0.1, ("0", "Q"): 0.1,
+    ("1", "I"): 0.1, ("1", "l"): 0.1, ("1", "|"): 0.1, ("5", "S"): 0.1,
+    ("2", "Z"): 0.1, ("8", "B"): 0.1, ("6", "G"): 0.1,
+    # Digits that look alike
+    ("1", "7"): 0.5, ("3", "8"): 0.5, ("5", "6"): 0.5, ("6", "8"): 0.5,
+    ("0", "8"): 0.5, ("0", "9"): 0.5, ("8", "9"): 0.5,
+    # Letters that look alike
+    ("C", "G"): 0.5, ("C", "O"): 0.5, ("E", "F"): 0.5, ("H", "N"): 0.5,
+}
+SUBSTITUTION_COSTS = {**OCR_CONFUSIONS, **{(b, a): cost for (a, b), cost in OCR_CONFUSIONS.items()}}
+
+
+class CodeMatch(NamedTuple):
+    """Closest master code for a misread code"""
+    code: str
+    cost: float  # Confusion-weighted edit distance from the misread code
+    score: float  # 1 - cost / code length, 1.0 is an exact match
+
+
+def canonical_code(code: str) -> str:
+    """
+    Undo letter/digit misreads that the code layout makes unambiguous
+
+    Codes are 6 digits - 4 digits - letters, so a letter in the numeric
+    parts or a digit in the suffix can only be a misread.
+
+    Args:
+        code: Product code as read
+
+    Returns:
+        Code with lookalike characters swapped back
+    """
+    parts = code.split('-')
+    if len(parts) != 3:
+        return code
+    return '-'.join((parts[0].translate(LETTER_TO_DIGIT), parts[1].translate(LETTER_TO_DIGIT),
+                     parts[2].translate(DIGIT_TO_LETTER)))
+
+
+def ocr_edit_cost(a: str, b: str, costs: Mapping[Tuple[str, str], float] = SUBSTITUTION_COSTS) -> float:
+    """
+    Edit distance where OCR lookalike substitutions are cheap
+
+    Args:
+        a: First string
+        b: Second string
+        costs: Substitution costs below 1, an empty mapping for plain edit distance
+
+    Returns:
+        Weighted edit distance
+    """
+    if len(a) == len(b):
+        mismatches = [(char_a, char_b) for char_a, char_b in zip(a, b) if char_a != char_b]
+        # A single substitution is never beaten by an insertion plus a deletion
+        if len(mismatches) <= 1:
+            return sum((costs.get(pair, 1.0) for pair in mismatches), 0.0)
+
+    previous = [float(j) for j in range(len(b) + 1)]
+    for i, char_a in enumerate(a, 1):
+        current = [float(i)]
+        for j, char_b in enumerate(b, 1):
+            if char_a == char_b:
+                substitution = previous[j - 1]
+            else:
+                substitution = previous[j - 1] + costs.get((char_a, char_b), 1.0)
+            current.append(min(substitution, previous[j] + 1, current[j - 1] + 1))
+        previous = current
+    return previous[-1]
+
+
+def is_ocr_misread(code: str, candidate: str) -> bool:
+    """
+    Check whether a misread code differs from a candidate only by OCR lookalikes
+
+    Args:
+        code: Canonical product code as read
+        candidate: Master product code
+
+    Returns:
+        True if every differing character is an OCR_CONFUSIONS substitution
+    """
+    return len(code) == len(candidate) and all(
+        (char_a, char_b) in SUBSTITUTION_COSTS for char_a, char_b in zip(code, candidate) if char_a != char_b
+    )
+
+
+def _deletions(code: str, edits: int) -> Set[str]:
+    """Every string left after deleting up to edits characters from code"""
+    variants = {code}
+    frontier = {code}
+    for _ in range(edits):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+class ProductCodeIndex:
+    """
+    Deletion-neighbourhood index over the master product codes
+
+    Every canonical code is stored under each string left after deleting up
+    to max_edits of its characters. A misread code within max_edits edits of
+    a master code shares at least one of those strings with it, so a lookup
+    is a handful of dictionary probes rather than a scan of the catalog.
+    Candidates are then ranked with the OCR-weighted edit cost. The index
+    is read-only once built, so lookups are safe from any thread.
+    """
+
+    def __init__(self, codes: Iterable[str], max_edits: int = Config.FUZZY_MAX_EDITS):
+        """
+        Build the index
+
+        Args:
+            codes: Master product codes
+            max_edits: Edits (after canonical_code) a lookup may bridge
+        """
+        self.max_edits = max_edits
+        self.codes = frozenset(codes)
+        neighbours: Dict[str, List[str]] = {}
+        for code in sorted(self.codes):
+            for variant in _deletions(canonical_code(code), max_edits):
+                neighbours.setdefault(variant, []).append(code)
+        self._neighbours: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+            {variant: tuple(codes) for variant, codes in neighbours.items()}
+        )
+
+    def candidates(self, code: str) -> List[CodeMatch]:
+        """
+        Master codes close to a misread code, best first
+
+        Args:
+            code: Product code as read
+
+        Returns:
+            Matches within max_edits of the canonical code, sorted by cost then code
+        """
+        canonical = canonical_code(code)
+        found = set()
+        for variant in _deletions(canonical, self.max_edits):
+            found.update(self._neighbours.get(variant, ()))
+
+        # Swapping lookalikes back is a substitution per character, so price it once
+        repair_cost = sum(SUBSTITUTION_COSTS[pair] for pair in zip(code, canonical) if pair[0] != pair[1])
+        matches = []
+        for candidate in found:
+            cost = repair_cost + ocr_edit_cost(canonical, candidate)
+            matches.append(CodeMatch(candidate, cost, self._score(code, candidate, cost)))
+        matches.sort(key=lambda match: (match.cost, match.code))
+        return matches
+
+    def best_match(self, code: str, accept: Optional[Callable[[str], bool]] = None,
+                   min_score: float = Config.FUZZY_MIN_SCORE) -> Optional[CodeMatch]:
+        """
+        The single closest master code, if there is an unambiguous one
+
+        Only OCR lookalike substitutions are bridged automatically. The catalog
+        is dense, so a code one ordinary edit from a master code is usually a
+        different product rather than a misread, and is left unmatched. A
+        lookalike match is also rejected when another master code is just as
+        few plain edits away, since then the digits alone can't tell them apart.
+
+        Args:
+            code: Product code as read
+            accept: Only consider master codes this returns True for, such
+                as codes stocked in the ordered length
+            min_score: Lowest score to accept
+
+        Returns:
+            Best match, or None when nothing is close enough or the match is ambiguous
+        """
+        canonical = canonical_code(code)
+        matches = [match for match in self.candidates(code) if accept is None or accept(match.code)]
+        misreads = [match for match in matches if is_ocr_misread(canonical, match.code)]
+        if not misreads or misreads[0].score < min_score:
+            return None
+
+        best = misreads[0]
+        edits = ocr_edit_cost(canonical, best.code, costs={})
+        for match in matches:
+            if match is not best and (match.cost <= best.cost
+                                      or ocr_edit_cost(canonical, match.code, costs={}) <= edits):
+                # Ambiguous, a blank SKU is better than a wrong one
+                return None
+        return best
+
+    @staticmethod
+    def _score(code: str, candidate: str, cost: float) -> float:
+        """Similarity from 0 to 1 for a weighted edit cost"""
+        return max(0.0, 1.0 - cost / max(len(code), len(candidate), 1))
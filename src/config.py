@@ -3,6 +3,7 @@ Configuration Module
 Stores application configuration and constants
 """
 
+import re
 from dataclasses import dataclass
 from typing import Optional
 
@@ -21,6 +22,55 @@ class Config:
 
     # OCR settings
     DEFAULT_DPI = 300
+    ADAPTIVE_DPI = False  # OCR at DPI_TIERS[0] first and re-rasterize only pages that fail to parse
+    DPI_TIERS = (150, 300)
+    PLAUSIBLE_LENGTH_RANGE = (1, 60)  # Board lengths in feet that adaptive DPI accepts as read correctly
+    OCR_WORKERS = None  # Processes for page-parallel OCR, None = one per CPU core
+    OCR_BACKEND = "auto"  # "pytesseract", "tesserocr", or "auto" (tesserocr when installed)
+    USE_TEXT_LAYER = True  # Parse born-digital PDFs' embedded text and skip OCR when possible
+    STREAM_PAGES = False  # Rasterize RASTER_WINDOW pages at a time to bound memory on long POs
+    RASTER_WINDOW = 2
+    DEBUG_IMAGES_DIR = None  # Save rasterized pages here for debugging, None = never touch disk
+    GUI_JOBS = 2  # PDFs the GUI processes at once; each also OCRs its pages in parallel
+
+    # Persistent OCR result cache, keyed by page pixels + DPI + tesseract version/config
+    OCR_CACHE_ENABLED = True
+    OCR_CACHE_MAX_MB = 200
+
+    # Region-of-interest OCR: page-relative (left, top, right, bottom) boxes
+    REGION_OCR = False  # OCR only these regions, re-running full pages whose region text looks incomplete
+    OCR_HEADER_REGION = (0.0, 0.0, 1.0, 0.2)  # "LUMBER CO. Dxxxx" header, first page only
+    OCR_TABLE_REGION = (0.0, 0.25, 1.0, 0.8)  # Line-item table on the first page
+    OCR_CONTINUATION_TABLE_REGION = (0.0, 0.05, 1.0, 0.8)  # Line-item table on later pages
+    REGION_EDGE_STRIP = 0.01  # Share of a table crop's height checked for text cut at its top and bottom
+    REGION_EDGE_INK_FRACTION = 0.002  # Dark pixels in an edge strip above this share mean a line was cut
+
+    # Image preprocessing before OCR (ImagePreprocessor options per preset)
+    PREPROCESS = "none"
+    PREPROCESS_PRESETS = {
+        "none": None,
+        "gray": {},
+        "binary": {"binarize": True},
+        "full": {"binarize": True, "remove_borders": True, "denoise": True, "deskew": True},
+    }
+
+    # Per-stage timing and memory metrics, one JSON record per processed PO
+    METRICS_LOG = None  # JSON Lines file to append each run's metrics to, None = don't log
+
+    # Combined batch workbook (main.py --combined)
+    COMBINED_MAX_SHEETS = 500  # PO sheets per workbook; each holds an open temp file until the workbook closes
+
+    # Local HTTP service (main.py --serve)
+    SERVER_HOST = "127.0.0.1"  # Loopback only, so the service can't be reached from other machines
+    SERVER_PORT = 8765
+    SERVER_QUEUE_SIZE = 8  # Uploads that may wait for a free worker before new ones get 503
+    SERVER_MAX_UPLOAD_MB = 50
+
+    # Master product list
+    MASTER_CACHE_SUFFIX = ".pkl"  # Normalized master list caches live in the per-user cache directory
+    FUZZY_MATCHING = True  # Match misread product codes to the closest master code
+    FUZZY_MAX_EDITS = 1  # Lookalike substitutions a misread code may be from its master code, besides letter/digit ones
+    FUZZY_MIN_SCORE = 0.9  # Lowest similarity (1 - weighted edits / code length) accepted as a match
 
     # Excel formatting colors
     HEADER_BG_COLOR = "#D9D9D9"
@@ -41,7 +91,12 @@ class Config:
 
     # Regex patterns
     PO_NUMBER_PATTERN = r'LUMBER CO\.?\s+D(\d+)'
-    PRODUCT_CODE_PATTERN = r'\b(\d{6}-\d{4}-[A-Z]+)\b'
+    # Letters tesseract misreads digits as, and the digit each one stands for
+    OCR_DIGIT_LOOKALIKES = {"O": "0", "o": "0", "D": "0", "Q": "0", "I": "1", "l": "1", "|": "1",
+                            "S": "5", "Z": "2", "B": "8", "G": "6"}
+    OCR_DIGIT = rf'[\d{re.escape("".join(OCR_DIGIT_LOOKALIKES))}]'  # A digit or one of its lookalikes
+    PRODUCT_CODE_PATTERN = rf'\b({OCR_DIGIT}{{6}}-{OCR_DIGIT}{{4}}-[A-Z]+)\b'
     DIMENSIONS_PATTERN = r'(\d+/\d+\'(?:,\s*\d+/\d+\')*)'
     SIZE_PATTERN = r'^\s*([\d.]+\s*[Xx]\s*[\d.]+)'  # Handles both "2X6" and "2 X 6"
-    PRODUCT_BLOCK_START_PATTERN = r'^\d+\s+L[FE]\s+\d{6}-\d{4}-[A-Z]+'
\ No newline at end of file
+    PRODUCT_BLOCK_START_PATTERN = rf'^\d+\s+L[FE]\s+{OCR_DIGIT}{{6}}-{OCR_DIGIT}{{4}}-[A-Z]+'
+    PRODUCT_BLOCK_END_PATTERN = r"\d+/\d+'"  # A dimension line closes a product block
\ No newline at end of file
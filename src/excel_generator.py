@@ -4,42 +4,193 @@ Generates formatted Excel reports for purchase orders
 """
 
 import re
+import threading
 from datetime import date
-from typing import List, Dict, Any
-import pandas as pd
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, NamedTuple
 import xlsxwriter
+from .config import Config
+from .line_items import LineItem
+
+SIZE_SEPARATOR_RE = re.compile(r'\s*[Xx]\s*')
+INVALID_SHEET_CHARS_RE = re.compile(r'[\[\]:*?/\\]')
+
+NUM_COLUMNS = 5
+
+# Cell formats, added to each workbook once
+FORMATS = {
+    "title": {
+        "bold": True,
+        "font_size": 18,
+        "align": "center",
+        "valign": "vcenter"
+    },
+    "bold": {
+        "bold": True,
+        "font_size": 12
+    },
+    "sub_header": {
+        "font_size": 12
+    },
+    "header": {
+        "bold": True,
+        "align": "center",
+        "valign": "vcenter",
+        "bg_color": "#D9D9D9",
+        "border": 1
+    },
+    "table": {
+        'text_wrap': True,
+        'align': 'center',
+        'valign': 'vcenter',
+        'border': 1
+    },
+    "footer": {
+        'bold': True,
+        'font_color': 'red',
+        'bg_color': 'yellow',
+        'align': 'center',
+        'valign': 'vcenter',
+        'border': 1
+    },
+    "fuzzy": {
+        'text_wrap': True,
+        'align': 'center',
+        'valign': 'vcenter',
+        'bg_color': '#FFEB9C',
+        'border': 1
+    },
+    "percent": {
+        'num_format': '0.0%'
+    },
+}
+
+# Format per (row, column) of the header block; other header cells are left plain
+HEADER_CELL_FORMATS = {
+    (1, 0): "bold",
+    (1, 1): "sub_header",
+    (2, 1): "sub_header",
+    (3, 1): "sub_header",
+    (4, 0): "bold",
+    (4, 1): "sub_header",
+    (5, 4): "bold",
+}
+
+
+class SheetSummary(NamedTuple):
+    """Totals for one written PO sheet"""
+    lines: int
+    total_units: int
+    matched_lines: int
+    fuzzy_lines: int  # Matched through a misread product code, worth checking
+
+
+class SheetLocation(NamedTuple):
+    """Where a PO was written in a consolidated report"""
+    output_file: str
+    sheet_name: str
 
 
 class ExcelGenerator:
-    def generate_report(self, po_number: str, products: List[Dict[str, Any]], output_file: str):
+    def generate_report(self, po_number: str, products: Iterable[LineItem], output_file: str):
         """
         Generate Excel report for purchase order
 
+        Rows are streamed straight to the file with xlsxwriter's
+        constant_memory mode, so products can be any iterable, including a
+        generator, and only the current row is held in memory.
+
         Args:
             po_number: Purchase order number
-            products: List of matched products
+            products: Matched products
             output_file: Output file path
         """
-        # Create header rows
-        header_rows = self._create_header_rows(po_number)
+        workbook = xlsxwriter.Workbook(output_file, {'constant_memory': True})
+        try:
+            formats = self._add_formats(workbook)
+            worksheet = workbook.add_worksheet("Sheet1")
+            self._write_sheet(worksheet, formats, po_number, products)
+        finally:
+            workbook.close()
+
+    def _add_formats(self, workbook: xlsxwriter.Workbook) -> Dict[str, Any]:
+        """
+        Add the report's cell formats to a workbook
 
-        # Create Disdero number row
-        disdero_row = [po_number, "", "", "", ""]
+        Args:
+            workbook: Target workbook
 
-        # Convert products to rows
-        product_rows = self._create_product_rows(products)
+        Returns:
+            Format objects keyed by FORMATS name
+        """
+        return {name: workbook.add_format(properties) for name, properties in FORMATS.items()}
 
-        # Create footer row
-        footer_row = self._create_footer_row(products)
+    def _write_sheet(self, worksheet, formats: Dict[str, Any], po_number: str,
+                     products: Iterable[LineItem]) -> SheetSummary:
+        """
+        Write one PO report to a worksheet, strictly top to bottom
 
-        # Combine all rows
-        all_rows = header_rows + [disdero_row] + product_rows + [footer_row]
+        Args:
+            worksheet: Empty worksheet
+            formats: Formats from _add_formats
+            po_number: Purchase order number
+            products: Matched products
 
-        # Create DataFrame
-        df = pd.DataFrame(all_rows)
+        Returns:
+            Line, unit and matched line counts for the PO
+        """
+        for col_name, width in Config.COLUMN_WIDTHS.items():
+            worksheet.set_column(f"{col_name}:{col_name}", width)
 
-        # Write to Excel with formatting
-        self._write_formatted_excel(df, output_file, po_number)
+        header_rows = self._create_header_rows(po_number)
+        column_header = header_rows.pop()
+
+        # Title row
+        worksheet.set_row(0, Config.DEFAULT_ROW_HEIGHT)
+        worksheet.merge_range(0, 0, 0, NUM_COLUMNS - 1, header_rows[0][0], formats["title"])
+
+        # Sub-header rows
+        for row_num in range(1, len(header_rows)):
+            worksheet.set_row(row_num, Config.DEFAULT_ROW_HEIGHT)
+            for col_num, value in enumerate(header_rows[row_num]):
+                if (row_num, col_num) in HEADER_CELL_FORMATS:
+                    worksheet.write(row_num, col_num, value,
+                                    formats[HEADER_CELL_FORMATS[(row_num, col_num)]])
+
+        # Header row
+        row_num = len(header_rows)
+        worksheet.set_row(row_num, Config.DEFAULT_ROW_HEIGHT)
+        worksheet.write_row(row_num, 0, column_header, formats["header"])
+
+        # Disdero number, then table data
+        row_num += 1
+        worksheet.set_row(row_num, Config.DEFAULT_ROW_HEIGHT)
+        worksheet.write_row(row_num, 0, [po_number, "", "", "", ""], formats["table"])
+
+        lines = total_units = matched_lines = fuzzy_lines = 0
+        for row, product in self._iter_product_rows(products):
+            row_num += 1
+            worksheet.set_row(row_num, Config.DEFAULT_ROW_HEIGHT)
+            worksheet.write_row(row_num, 0, row, formats["table"])
+            lines += 1
+            total_units += self._extract_units(product.quantity)
+            if row[2]:
+                matched_lines += 1
+            if 0.0 < product.match_score < 1.0:
+                # The SKU was guessed from a misread code, so flag it for review
+                fuzzy_lines += 1
+                worksheet.write(row_num, 2, row[2], formats["fuzzy"])
+                worksheet.write_comment(row_num, 2, self._fuzzy_note(product))
+
+        # Footer
+        row_num += 1
+        footer_row = self._create_footer_row(total_units)
+        worksheet.set_row(row_num, Config.DEFAULT_ROW_HEIGHT)
+        worksheet.write_row(row_num, 0, footer_row[:3], formats["table"])
+        worksheet.write(row_num, 3, footer_row[3], formats["footer"])
+        worksheet.write(row_num, 4, footer_row[4], formats["table"])
+
+        return SheetSummary(lines, total_units, matched_lines, fuzzy_lines)
 
     def _create_header_rows(self, po_number: str) -> List[List[str]]:
         """
@@ -61,46 +212,57 @@ class ExcelGenerator:
             ["Disdero #", "Dimension", "SKU#", "PRODUCT DESCRIPTION", "QUANTITY"],
         ]
 
-    def _create_product_rows(self, products: List[Dict[str, Any]]) -> List[List[str]]:
+    def _iter_product_rows(self, products: Iterable[LineItem]) -> Iterator[tuple]:
         """
-        Create product rows for the report
+        Create product rows for the report, one product at a time
 
         Args:
-            products: List of products
+            products: Matched products
 
-        Returns:
-            List of product rows
+        Yields:
+            (row, product) tuples
         """
-        rows = []
         for p in products:
             # Normalize size by removing spaces and converting X to *
-            if p['Size']:
+            if p.size:
                 # Remove any spaces around X/x and convert to uppercase
-                normalized_size = re.sub(r'\s*[Xx]\s*', 'X', p['Size'])
-                dimension = f"{normalized_size.replace('X', '*')}*{p['Dimension_Length']}"
+                normalized_size = SIZE_SEPARATOR_RE.sub('X', p.size)
+                dimension = f"{normalized_size.replace('X', '*')}*{p.length}"
             else:
-                dimension = str(p['Dimension_Length'])
+                dimension = str(p.length)
 
-            rows.append([
+            yield [
                 "",
                 dimension,
-                p["SKU#"],
-                p["Product_Description"],
-                p["Quantity"]
-            ])
-        return rows
+                p.sku,
+                p.description,
+                p.quantity
+            ], p
+
+    def _fuzzy_note(self, product: LineItem) -> str:
+        """
+        Cell comment explaining a SKU matched through a misread product code
+
+        Args:
+            product: Fuzzy matched product
+
+        Returns:
+            Comment text
+        """
+        return (f"Product code read as {product.product_code} is not in the master list. "
+                f"This SKU is the closest OCR lookalike (match score {product.match_score:.2f}), "
+                f"check it against the PO.")
 
-    def _create_footer_row(self, products: List[Dict[str, Any]]) -> List[str]:
+    def _create_footer_row(self, total_units: int) -> List[str]:
         """
         Create footer row with total units
 
         Args:
-            products: List of products
+            total_units: Unit count over all products
 
         Returns:
             Footer row
         """
-        total_units = sum(self._extract_units(p["Quantity"]) for p in products)
         return ["", "", "", f"** {total_units} UNITS TOTAL **", ""]
 
     def _extract_units(self, qty_str: str) -> int:
@@ -116,99 +278,115 @@ class ExcelGenerator:
         parts = str(qty_str).split()
         return int(parts[0]) if parts and parts[0].isdigit() else 0
 
-    def _write_formatted_excel(self, df: pd.DataFrame, output_file: str, po_number: str):
+
+class ConsolidatedReport:
+    """
+    One workbook holding many POs, for batch runs
+
+    The first sheet indexes every PO (lines, total units, the share of lines
+    matched to the master list and how many of those were matched through a
+    misread product code), followed by one report sheet per PO.
+    Sheets are streamed to disk as each PO is added, so memory stays flat
+    however many POs the batch has. add_po may be called from several
+    threads.
+
+    In constant_memory mode every sheet keeps a temporary file open until
+    the workbook is closed, so a workbook holds at most max_sheets POs.
+    Later POs roll over into "<name> (2).xlsx", "<name> (3).xlsx" and so
+    on, each with its own index, which keeps a batch of thousands of POs
+    clear of the per-process open file limit.
+    """
+
+    INDEX_HEADER = ["PO", "Lines", "Total Units", "Match Rate", "Fuzzy Matches"]
+    INDEX_WIDTHS = [14, 10, 14, 14, 16]
+
+    def __init__(self, output_file: str, max_sheets: int = Config.COMBINED_MAX_SHEETS):
         """
-        Write DataFrame to Excel with formatting
+        Create the first workbook and its index sheet
 
         Args:
-            df: DataFrame to write
             output_file: Output file path
+            max_sheets: PO sheets per workbook before rolling over to the next file
+        """
+        self.output_file = output_file
+        self.max_sheets = max(1, max_sheets)
+        self.output_files: List[str] = []
+        self._generator = ExcelGenerator()
+        self._lock = threading.Lock()
+        self._open_workbook()
+
+    def _open_workbook(self):
+        """Start the next workbook in the series, with an empty index sheet"""
+        path = Path(self.output_file)
+        if self.output_files:
+            path = path.with_name(f"{path.stem} ({len(self.output_files) + 1}){path.suffix}")
+        self.output_files.append(str(path))
+
+        self._workbook = xlsxwriter.Workbook(str(path), {'constant_memory': True})
+        self._formats = self._generator._add_formats(self._workbook)
+        self._sheet_names = set()
+        self._po_sheets = 0
+
+        self._index = self._workbook.add_worksheet("Index")
+        self._sheet_names.add("index")
+        for col_num, width in enumerate(self.INDEX_WIDTHS):
+            self._index.set_column(col_num, col_num, width)
+        self._index.write_row(0, 0, self.INDEX_HEADER, self._formats["header"])
+        self._index_row = 0
+
+    def add_po(self, po_number: str, products: Iterable[LineItem]) -> SheetLocation:
+        """
+        Write one PO as a new sheet and add it to the index
+
+        Args:
             po_number: Purchase order number
+            products: Matched products
+
+        Returns:
+            Workbook file and name of the new sheet
+        """
+        with self._lock:
+            if self._po_sheets >= self.max_sheets:
+                # Release this workbook's temporary files before opening more
+                self._workbook.close()
+                self._open_workbook()
+            self._po_sheets += 1
+            sheet_name = self._unique_sheet_name(po_number)
+            worksheet = self._workbook.add_worksheet(sheet_name)
+            summary = self._generator._write_sheet(worksheet, self._formats, po_number, products)
+
+            self._index_row += 1
+            self._index.write_url(self._index_row, 0, f"internal:'{sheet_name}'!A1", string=po_number)
+            self._index.write_number(self._index_row, 1, summary.lines)
+            self._index.write_number(self._index_row, 2, summary.total_units)
+            if summary.lines:
+                self._index.write_number(self._index_row, 3, summary.matched_lines / summary.lines,
+                                         self._formats["percent"])
+            self._index.write_number(self._index_row, 4, summary.fuzzy_lines)
+            return SheetLocation(self.output_files[-1], sheet_name)
+
+    def close(self):
+        """Finish writing the last workbook"""
+        with self._lock:
+            self._workbook.close()
+
+    def _unique_sheet_name(self, po_number: str) -> str:
+        """
+        Turn a PO number into a valid sheet name not used yet in this workbook
+
+        Args:
+            po_number: Purchase order number
+
+        Returns:
+            Sheet name of at most 31 characters
         """
-        num_rows = len(df)
-
-        with pd.ExcelWriter(output_file, engine="xlsxwriter") as writer:
-            df.to_excel(writer, sheet_name="Sheet1", index=False, header=False)
-
-            workbook = writer.book
-            worksheet = writer.sheets["Sheet1"]
-
-            # Set row heights
-            for i in range(num_rows):
-                worksheet.set_row(i, 27)
-
-            # Define formats
-            title_format = workbook.add_format({
-                "bold": True,
-                "font_size": 18,
-                "align": "center",
-                "valign": "vcenter"
-            })
-
-            bold_format = workbook.add_format({
-                "bold": True,
-                "font_size": 12
-            })
-
-            sub_header_format = workbook.add_format({
-                "font_size": 12
-            })
-
-            header_format = workbook.add_format({
-                "bold": True,
-                "align": "center",
-                "valign": "vcenter",
-                "bg_color": "#D9D9D9",
-                "border": 1
-            })
-
-            table_format = workbook.add_format({
-                'text_wrap': True,
-                'align': 'center',
-                'valign': 'vcenter',
-                'border': 1
-            })
-
-            footer_format = workbook.add_format({
-                'bold': True,
-                'font_color': 'red',
-                'bg_color': 'yellow',
-                'align': 'center',
-                'valign': 'vcenter',
-                'border': 1
-            })
-
-            # Apply formatting
-            # Title row
-            worksheet.merge_range("A1:E1", df.iloc[0, 0], title_format)
-
-            # Sub-header rows
-            worksheet.write("A2", df.iloc[1, 0], bold_format)
-            worksheet.write("B2", df.iloc[1, 1], sub_header_format)
-            worksheet.write("B3", df.iloc[2, 1], sub_header_format)
-            worksheet.write("B4", df.iloc[3, 1], sub_header_format)
-            worksheet.write("A5", df.iloc[4, 0], bold_format)
-            worksheet.write("B5", df.iloc[4, 1], sub_header_format)
-            worksheet.write("E6", df.iloc[5, 4], bold_format)
-
-            # Header row
-            for col_num in range(5):
-                worksheet.write(6, col_num, df.iloc[6, col_num], header_format)
-
-            # Disdero number
-            worksheet.write("A8", df.iloc[7, 0], bold_format)
-
-            # Table data
-            for col_num in range(5):
-                for row_num in range(7, num_rows):
-                    worksheet.write(row_num, col_num, df.iloc[row_num, col_num], table_format)
-
-            # Footer
-            worksheet.write(num_rows - 1, 3, df.iloc[num_rows - 1, 3], footer_format)
-
-            # Set column widths
-            worksheet.set_column("A:A", 10)
-            worksheet.set_column("B:B", 16)
-            worksheet.set_column("C:C", 22)
-            worksheet.set_column("D:D", 47)
-            worksheet.set_column("E:E", 25)
\ No newline at end of file
+        base = INVALID_SHEET_CHARS_RE.sub('_', po_number).strip("'")[:31] or "PO"
+        name = base
+        suffix = 1
+        # Excel compares sheet names case-insensitively
+        while name.lower() in self._sheet_names:
+            suffix += 1
+            tag = f" ({suffix})"
+            name = f"{base[:31 - len(tag)]}{tag}"
+        self._sheet_names.add(name.lower())
+        return name
@@ -0,0 +1,163 @@
+"""
+Instrumentation Module
+Per-stage wall time, CPU time and peak memory for one PO run, as JSON
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+from .resource_usage import child_cpu_seconds, peak_rss_bytes
+
+# Serializes appends when batch jobs share a log file
+_log_lock = threading.Lock()
+
+
+class RunMetrics:
+    """
+    Stage measurements for one PO run
+
+    Each stage records:
+      wall_seconds          elapsed time
+      cpu_seconds           CPU time of the thread running the run
+      child_cpu_seconds     CPU time of child processes (tesseract, pdftoppm)
+                            that finished during the stage; None on Windows
+      peak_rss_delta_bytes  how far the stage raised the process's peak RSS
+      calls                 times the stage was entered
+
+    Stages can nest, such as rasterizing inside the OCR loop when pages are
+    streamed; the inner time is subtracted from the outer stage so stages
+    don't double count. Time measured inside OCR worker processes, such as
+    preprocessing, is added with add() and overlaps the ocr stage.
+    """
+
+    def __init__(self, pdf_path: str):
+        """
+        Start measuring a run
+
+        Args:
+            pdf_path: PDF being processed
+        """
+        self.pdf_path = str(pdf_path)
+        self.po_number: Optional[str] = None
+        self.error: Optional[str] = None
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._start = time.perf_counter()
+        self._nested = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Measure the enclosed block as (part of) a stage
+
+        Args:
+            name: Stage name
+        """
+        before = self._snapshot()
+        self._nested.append([0.0, 0.0, 0.0])
+        try:
+            yield
+        finally:
+            nested_wall, nested_cpu, nested_child = self._nested.pop()
+            after = self._snapshot()
+            wall = after[0] - before[0]
+            cpu = after[1] - before[1]
+            child = None if before[2] is None else after[2] - before[2]
+            peak = None if before[3] is None else after[3] - before[3]
+
+            self._record(name, wall - nested_wall, cpu - nested_cpu,
+                         None if child is None else child - nested_child, peak)
+            if self._nested:
+                # Keep the enclosing stage from counting this time again
+                outer = self._nested[-1]
+                outer[0] += wall
+                outer[1] += cpu
+                outer[2] += child or 0.0
+
+    def iter_stage(self, name: str, items: Iterable) -> Iterator:
+        """
+        Attribute the time spent producing each item of a lazy iterable to a stage
+
+        Args:
+            name: Stage name
+            items: Iterable, such as a page generator
+
+        Yields:
+            The items of the iterable
+        """
+        iterator = iter(items)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def add(self, name: str, wall_seconds: float, cpu_seconds: float):
+        """
+        Add time measured elsewhere, such as in worker processes, to a stage
+
+        Args:
+            name: Stage name
+            wall_seconds: Elapsed time
+            cpu_seconds: CPU time
+        """
+        self._record(name, wall_seconds, cpu_seconds, None, None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The run as a JSON-serializable record"""
+        return {
+            'pdf': self.pdf_path,
+            'po_number': self.po_number,
+            'started_at': self.started_at,
+            'status': 'error' if self.error else 'ok',
+            'error': self.error,
+            'total_wall_seconds': round(time.perf_counter() - self._start, 6),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'stages': self.stages,
+        }
+
+    def to_json(self) -> str:
+        """The run as a single line of JSON"""
+        return json.dumps(self.to_dict())
+
+    def append_to(self, log_file: str):
+        """
+        Append the run to a JSON Lines log
+
+        Args:
+            log_file: Log file path
+        """
+        line = self.to_json() + '\n'
+        try:
+            with _log_lock, open(log_file, 'a', encoding='utf-8') as f:
+                f.write(line)
+        except OSError as e:
+            # Metrics are diagnostics, never fail a PO over them
+            print(f"Warning: Could not write metrics to {log_file}: {e}")
+
+    def _record(self, name: str, wall: float, cpu: float, child: Optional[float], peak: Optional[int]):
+        """Accumulate one measurement into a stage"""
+        stage = self.stages.setdefault(name, {
+            'wall_seconds': 0.0,
+            'cpu_seconds': 0.0,
+            'child_cpu_seconds': None,
+            'peak_rss_delta_bytes': None,
+            'calls': 0,
+        })
+        stage['wall_seconds'] = round(stage['wall_seconds'] + wall, 6)
+        stage['cpu_seconds'] = round(stage['cpu_seconds'] + cpu, 6)
+        if child is not None:
+            stage['child_cpu_seconds'] = round((stage['child_cpu_seconds'] or 0.0) + child, 6)
+        if peak is not None:
+            stage['peak_rss_delta_bytes'] = (stage['peak_rss_delta_bytes'] or 0) + peak
+        stage['calls'] += 1
+
+    @staticmethod
+    def _snapshot():
+        """(wall, thread CPU, child CPU, peak RSS) right now"""
+        return time.perf_counter(), time.thread_time(), child_cpu_seconds(), peak_rss_bytes()
@@ -0,0 +1,172 @@
+"""
+Line Item Module
+The PO line record shared by parsing, matching and report generation
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, overload
+
+# Batches store text columns as 4-byte ids into a table of distinct values
+ID_TYPECODE = 'I'
+
+
+class LineItem(NamedTuple):
+    """
+    One purchase order line
+
+    The parser fills in product_code, dimensions and size; the matcher adds
+    the rest. Unmatched lines keep empty master fields and a score of 0.
+    """
+    product_code: Optional[str]
+    dimensions: Optional[str]  # "count/length'" as read, such as "56/12'"
+    size: Optional[str]  # Such as "2X6" or "2 X 6"
+    sku: str = ""
+    description: str = ""
+    length: int = 0  # Length in feet from the dimensions
+    quantity: str = ""  # Units and master quantity, such as "3 UNIT @ 56PC.EA."
+    match_score: float = 0.0  # 1.0 exact, below 1.0 for a misread code, 0.0 unmatched
+
+
+# Column storage per field: text fields are dictionary encoded, numbers packed
+TEXT_FIELDS = ('product_code', 'dimensions', 'size', 'sku', 'description', 'quantity')
+NUMBER_TYPECODES = {'length': 'i', 'match_score': 'd'}
+
+
+class LineItemBatch(Sequence[LineItem]):
+    """
+    Column-oriented line items for large POs
+
+    A PO repeats the same handful of product codes, sizes, SKUs and
+    descriptions across thousands of lines. The batch keeps each distinct
+    string once and stores per-line ids and numbers in compact arrays, so
+    a line costs a few dozen bytes instead of a tuple of string objects.
+    It reads like a list of LineItem: indexing and iteration build the
+    records on the fly.
+    """
+
+    def __init__(self, items: Iterable[LineItem] = ()):
+        """
+        Create a batch
+
+        Args:
+            items: Line items to add
+        """
+        self._values: Dict[str, List[Any]] = {name: [] for name in TEXT_FIELDS}
+        self._ids: Dict[str, Dict[Any, int]] = {name: {} for name in TEXT_FIELDS}
+        self._columns: Dict[str, array] = {name: array(ID_TYPECODE) for name in TEXT_FIELDS}
+        self._columns.update({name: array(typecode) for name, typecode in NUMBER_TYPECODES.items()})
+        self.extend(items)
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Sequence[Any]]) -> 'LineItemBatch':
+        """
+        Build a batch from one sequence per field, without making LineItems
+
+        Args:
+            columns: Values keyed by every LineItem field name, all the same length
+
+        Returns:
+            New batch
+        """
+        batch = cls()
+        batch._extend_columns([columns[name] for name in LineItem._fields])
+        return batch
+
+    def append(self, item: LineItem):
+        """
+        Add a line item to the end of the batch
+
+        Args:
+            item: Line item
+        """
+        self._extend_columns([(value,) for value in item])
+
+    def extend(self, items: Iterable[LineItem]):
+        """
+        Add line items to the end of the batch
+
+        Args:
+            items: Line items
+        """
+        rows = list(items)
+        if rows:
+            self._extend_columns(list(zip(*rows)))
+
+    def _extend_columns(self, columns: List[Sequence[Any]]):
+        """Append values given per field, in LineItem field order"""
+        for name, column in zip(LineItem._fields, columns):
+            if name in NUMBER_TYPECODES:
+                self._columns[name].extend(column)
+                continue
+
+            ids = self._ids[name]
+            values = self._values[name]
+            # New values get the next id, in the order they are first seen
+            distinct = dict.fromkeys(column)
+            for value in distinct:
+                if value not in ids:
+                    ids[value] = len(values)
+                    values.append(value)
+            if len(distinct) == 1:
+                # Fields the parser leaves blank, for instance
+                self._columns[name].extend(array(ID_TYPECODE, [ids[value]]) * len(column))
+            else:
+                self._columns[name].extend(map(ids.__getitem__, column))
+
+    def column(self, name: str) -> List[Any]:
+        """
+        All values of one field, in line order
+
+        Args:
+            name: LineItem field name
+
+        Returns:
+            Field values
+        """
+        if name in NUMBER_TYPECODES:
+            return self._columns[name].tolist()
+        values = self._values[name]
+        return [values[value_id] for value_id in self._columns[name]]
+
+    def __len__(self) -> int:
+        return len(self._columns['length'])
+
+    @overload
+    def __getitem__(self, index: int) -> LineItem: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> 'LineItemBatch': ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LineItemBatch(self[i] for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line item index out of range")
+        return LineItem._make(
+            self._columns[name][index] if name in NUMBER_TYPECODES
+            else self._values[name][self._columns[name][index]]
+            for name in LineItem._fields
+        )
+
+    def __iter__(self) -> Iterator[LineItem]:
+        columns = []
+        for name in LineItem._fields:
+            if name in NUMBER_TYPECODES:
+                columns.append(self._columns[name])
+            else:
+                columns.append(map(self._values[name].__getitem__, self._columns[name]))
+        return map(LineItem._make, zip(*columns))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (LineItemBatch, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"LineItemBatch({len(self)} items)"
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the per-line arrays, excluding distinct values"""
+        return sum(column.itemsize * len(column) for column in self._columns.values())
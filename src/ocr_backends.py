@@ -0,0 +1,121 @@
+"""
+OCR Backends Module
+Interchangeable tesseract engines used by OCRExtractor
+"""
+
+import os
+from typing import Optional
+from PIL import Image
+import pytesseract
+
+
+class PytesseractBackend:
+    """Runs the tesseract executable once per call through pytesseract"""
+
+    name = "pytesseract"
+
+    def __init__(self, tesseract_cmd: Optional[str] = None, lang: str = "eng"):
+        """
+        Initialize pytesseract backend
+
+        Args:
+            tesseract_cmd: Tesseract executable (defaults to pytesseract's setting)
+            lang: Tesseract language
+        """
+        if tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        self.lang = lang
+
+    def image_to_string(self, image: Image.Image) -> str:
+        """OCR an image"""
+        return pytesseract.image_to_string(image, lang=self.lang)
+
+    def version(self) -> str:
+        """Tesseract version string"""
+        return str(pytesseract.get_tesseract_version())
+
+    def close(self):
+        """Nothing to release, each call is its own process"""
+
+
+class TesserocrBackend:
+    """Keeps one libtesseract engine loaded in-process through tesserocr"""
+
+    name = "tesserocr"
+
+    def __init__(self, tesseract_cmd: Optional[str] = None, lang: str = "eng"):
+        """
+        Initialize tesserocr backend, loading the language model once
+
+        Args:
+            tesseract_cmd: Tesseract executable, used to find the bundled tessdata folder
+            lang: Tesseract language
+        """
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        tessdata = None
+        if tesseract_cmd:
+            candidate = os.path.join(os.path.dirname(tesseract_cmd), 'tessdata')
+            if os.path.isdir(candidate):
+                tessdata = candidate
+
+        if tessdata:
+            self._api = tesserocr.PyTessBaseAPI(path=tessdata, lang=lang)
+        else:
+            self._api = tesserocr.PyTessBaseAPI(lang=lang)
+
+    def image_to_string(self, image: Image.Image) -> str:
+        """OCR an image"""
+        self._api.SetImage(image)
+        return self._api.GetUTF8Text()
+
+    def version(self) -> str:
+        """Tesseract version string"""
+        return self._tesserocr.tesseract_version().split('\n')[0]
+
+    def close(self):
+        """Release the engine"""
+        self._api.End()
+
+
+BACKENDS = {
+    PytesseractBackend.name: PytesseractBackend,
+    TesserocrBackend.name: TesserocrBackend,
+}
+
+
+def resolve_backend_name(name: str) -> str:
+    """
+    Resolve "auto" to the fastest installed backend
+
+    Args:
+        name: "auto" or a key of BACKENDS
+
+    Returns:
+        Backend name
+    """
+    if name != "auto":
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown OCR backend '{name}', choose from: auto, {', '.join(BACKENDS)}")
+        return name
+
+    try:
+        import tesserocr  # noqa: F401
+        return TesserocrBackend.name
+    except ImportError:
+        return PytesseractBackend.name
+
+
+def create_backend(name: str, tesseract_cmd: Optional[str] = None):
+    """
+    Create an OCR backend
+
+    Args:
+        name: "auto" or a key of BACKENDS
+        tesseract_cmd: Tesseract executable
+
+    Returns:
+        Backend instance
+    """
+    return BACKENDS[resolve_backend_name(name)](tesseract_cmd=tesseract_cmd)
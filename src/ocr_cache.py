@@ -0,0 +1,135 @@
+"""
+OCR Cache Module
+Persistent, content-addressed cache of OCR text per page image
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from PIL import Image
+from .runtime_config import user_cache_dir
+
+
+class OCRCache:
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 200 * 1024 * 1024):
+        """
+        Initialize OCR cache
+
+        Args:
+            cache_dir: Directory for cached text (defaults to the per-user cache directory)
+            max_bytes: Size bound; least recently used entries are evicted beyond it
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else user_cache_dir() / 'ocr'
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = sum(size for _, _, size in self._scan())
+
+    def make_key(self, image: Image.Image, namespace: str) -> str:
+        """
+        Hash a page image together with everything else that affects its OCR text
+
+        Args:
+            image: Page or region image as it will be sent to OCR
+            namespace: Tesseract version, OCR configuration and preprocessing settings
+
+        Returns:
+            Hex digest identifying the OCR result
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(namespace.encode('utf-8'))
+        # Pixel data alone doesn't capture DPI or layout, so include them
+        digest.update(f"|{image.mode}|{image.size}|{image.info.get('dpi')}|".encode('utf-8'))
+        digest.update(image.tobytes())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up cached OCR text
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Cached text, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding='utf-8')
+            # Bump the mtime so eviction treats this entry as recently used
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, key: str, text: str):
+        """
+        Store OCR text, evicting least recently used entries if over the size bound
+
+        Args:
+            key: Key from make_key
+            text: OCR text
+        """
+        path = self._path(key)
+        data = text.encode('utf-8')
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            # Caching is best effort, never fail a PO over it
+            print(f"Warning: Could not write OCR cache entry: {e}")
+            return
+
+        with self._lock:
+            self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current cache size"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'bytes': self._total_bytes}
+
+    def _path(self, key: str) -> Path:
+        """Shard entries into subdirectories to keep directory listings short"""
+        return self.cache_dir / key[:2] / f"{key}.txt"
+
+    def _scan(self):
+        """List (mtime, path, size) for every cache entry"""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.txt'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is back under 90% of its bound"""
+        target = self.max_bytes * 0.9
+        entries = self._scan()
+        self._total_bytes = sum(size for _, _, size in entries)
+
+        for _, path, size in sorted(entries):
+            if self._total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+                self._total_bytes -= size
+            except OSError:
+                pass
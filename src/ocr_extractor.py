@@ -3,13 +3,151 @@ OCR Extraction Module
 Handles text extraction and parsing from images
 """
 
+import os
 import re
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from PIL import Image
 import pytesseract
+from .config import Config
+from .line_items import LineItem, LineItemBatch
+from .ocr_backends import create_backend, resolve_backend_name
+from .po_parser import POTextParser, PO_NUMBER_RE, BLOCK_START_RE
+
+QUOTES_RE = re.compile(r'[\u2019\u0022]')
+
+
+# Long-lived OCR backend of a pool worker process, created by _init_worker
+_worker_backend = None
+
+
+def _init_worker(backend_name: str, tesseract_cmd: str):
+    """
+    Load the OCR backend once per worker process
+
+    Args:
+        backend_name: Backend to create
+        tesseract_cmd: Tesseract executable configured in the parent process
+    """
+    global _worker_backend
+    # Worker processes don't inherit the parent's pytesseract configuration
+    _worker_backend = create_backend(backend_name, tesseract_cmd=tesseract_cmd)
+
+
+def _ocr_page(image: Image.Image, preprocessor=None, backend=None) -> Tuple[str, float, float]:
+    """
+    Preprocess and OCR a single page
+
+    Args:
+        image: PIL Image object
+        preprocessor: Optional ImagePreprocessor applied before OCR
+        backend: OCR backend (defaults to this worker process's backend)
+
+    Returns:
+        Tuple of raw OCR text and the wall and CPU seconds spent preprocessing
+    """
+    preprocess_wall = preprocess_cpu = 0.0
+    if preprocessor is not None:
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        image = preprocessor.process(image)
+        preprocess_wall = time.perf_counter() - wall_start
+        preprocess_cpu = time.thread_time() - cpu_start
+    return (backend or _worker_backend).image_to_string(image), preprocess_wall, preprocess_cpu
 
 
 class OCRExtractor:
+    def __init__(self, workers: Optional[int] = Config.OCR_WORKERS, preprocessor=None, cache=None,
+                 backend: str = Config.OCR_BACKEND):
+        """
+        Initialize OCR extractor
+
+        Args:
+            workers: Number of processes used for page-parallel OCR
+                     (None uses every CPU core)
+            preprocessor: Optional ImagePreprocessor run on each page before OCR
+            cache: Optional OCRCache serving repeat pages without running tesseract
+            backend: OCR backend name, or "auto" to prefer an in-process engine
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.preprocessor = preprocessor
+        self.cache = cache
+        self.backend_name = resolve_backend_name(backend)
+        self._cache_namespace = None
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # Engines such as tesserocr aren't thread-safe, so each thread gets its own
+        self._local = threading.local()
+        # Every thread's engine, so close() can release those of GUI and server job threads too
+        self._backends = []
+        self._backends_lock = threading.Lock()
+        self._generation = 0  # Bumped by close() so threads don't reuse released engines
+
+    def close(self):
+        """Shut down the worker pool and release every thread's in-process engine"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+        with self._backends_lock:
+            backends, self._backends = self._backends, []
+            self._generation += 1
+        for backend in backends:
+            backend.close()
+
+    def warm_up(self):
+        """Start the OCR workers and load their engines before the first real page"""
+        blank = Image.new('L', (64, 32), color=255)
+        if self.workers <= 1:
+            self._get_backend().image_to_string(blank)
+            return
+        # One page per worker, so every process has started and loaded its engine
+        for future in [self._get_pool().submit(_ocr_page, blank, None) for _ in range(self.workers)]:
+            future.result()
+
+    def take_preprocess_time(self) -> Tuple[float, float]:
+        """
+        Return and reset the preprocessing time of pages OCRed for the calling thread
+
+        Returns:
+            Tuple of wall and CPU seconds summed over pages; pages preprocessed
+            in parallel workers can add up to more than the elapsed time
+        """
+        totals = getattr(self._local, 'preprocess_time', (0.0, 0.0))
+        self._local.preprocess_time = (0.0, 0.0)
+        return totals
+
+    def _add_preprocess_time(self, wall: float, cpu: float):
+        """Count a page's preprocessing time against the calling thread"""
+        total_wall, total_cpu = getattr(self._local, 'preprocess_time', (0.0, 0.0))
+        self._local.preprocess_time = (total_wall + wall, total_cpu + cpu)
+
+    def _get_backend(self):
+        """The calling thread's in-process OCR backend, created on first use"""
+        backend = getattr(self._local, 'backend', None)
+        if backend is None or self._local.generation != self._generation:
+            backend = create_backend(self.backend_name,
+                                     tesseract_cmd=pytesseract.pytesseract.tesseract_cmd)
+            with self._backends_lock:
+                self._backends.append(backend)
+                self._local.generation = self._generation
+            self._local.backend = backend
+        return backend
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """The worker pool, started on first use and kept so engines stay loaded"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.backend_name, pytesseract.pytesseract.tesseract_cmd)
+                )
+            return self._pool
+
     def extract_text(self, image: Image.Image) -> str:
         """
         Extract text from image using OCR
@@ -20,9 +158,277 @@ class OCRExtractor:
         Returns:
             Extracted text string
         """
-        text = pytesseract.image_to_string(image)
-        fixed_text = re.sub(r'[\u2019\u0022]', "'", text)
-        return fixed_text
+        text = self._get_backend().image_to_string(image)
+        return self._fix_quotes(text)
+
+    def extract_text_from_pages(self, images: Iterable[Image.Image]) -> str:
+        """
+        Extract text from each page in parallel and join it in page order
+
+        Args:
+            images: PIL Image objects, one per page; a generator is consumed
+                    lazily so only a few pages are in memory at once
+
+        Returns:
+            Extracted text string for the whole document
+        """
+        return self.join_page_texts(list(self.iter_page_texts(images)))
+
+    def join_page_texts(self, texts: List[str]) -> str:
+        """
+        Join raw per-page OCR text into one normalized document
+
+        Args:
+            texts: Raw OCR text per page, in page order
+
+        Returns:
+            Extracted text string for the whole document
+        """
+        if not texts:
+            raise ValueError("No images to extract text from")
+
+        return self._fix_quotes('\n'.join(texts))
+
+    def iter_page_texts(self, images: Iterable[Image.Image]) -> Iterator[str]:
+        """
+        OCR pages through the process pool, yielding raw text in page order
+
+        At most `workers` pages are in flight at a time, and each page is
+        released as soon as its text comes back.
+
+        Args:
+            images: PIL Image objects, one per page
+
+        Yields:
+            Raw OCR text per page
+        """
+        workers = self.workers
+        if hasattr(images, '__len__'):
+            workers = min(workers, len(images))
+
+        if workers <= 1:
+            # Not worth going through the process pool for a single page
+            backend = self._get_backend()
+            for image in images:
+                key = self._cache_key(image)
+                text = self._cache_get(key)
+                if text is None:
+                    text, preprocess_wall, preprocess_cpu = _ocr_page(image, self.preprocessor, backend)
+                    self._add_preprocess_time(preprocess_wall, preprocess_cpu)
+                    self._cache_put(key, text)
+                yield text
+            return
+
+        pool = self._get_pool()
+        # Cached pages queue up as plain text so output stays in page order
+        pending = deque()
+        for image in images:
+            key = self._cache_key(image)
+            text = self._cache_get(key)
+            if text is None:
+                # Preprocessing runs in the worker so it is parallel too
+                pending.append((key, pool.submit(_ocr_page, image, self.preprocessor)))
+            else:
+                pending.append((key, text))
+            del image
+            if len(pending) >= workers:
+                yield self._resolve(*pending.popleft())
+        while pending:
+            yield self._resolve(*pending.popleft())
+
+    def _resolve(self, key: Optional[str], result) -> str:
+        """
+        Wait for a pending OCR result and cache it
+
+        Args:
+            key: Cache key for the page (None when caching is off)
+            result: OCR text from the cache, or a Future from the process pool
+
+        Returns:
+            OCR text
+        """
+        if isinstance(result, str):
+            return result
+        text, preprocess_wall, preprocess_cpu = result.result()
+        self._add_preprocess_time(preprocess_wall, preprocess_cpu)
+        self._cache_put(key, text)
+        return text
+
+    def _cache_key(self, image: Image.Image) -> Optional[str]:
+        """Key a page in the OCR cache, or None when caching is off"""
+        if self.cache is None:
+            return None
+
+        if self._cache_namespace is None:
+            # Anything that changes tesseract's output must change the key
+            preprocess = sorted(vars(self.preprocessor).items()) if self.preprocessor else None
+            self._cache_namespace = (
+                f"backend={self.backend_name}"
+                f"|tesseract={self._get_backend().version()}"
+                f"|preprocess={preprocess}"
+            )
+        return self.cache.make_key(image, self._cache_namespace)
+
+    def _cache_get(self, key: Optional[str]) -> Optional[str]:
+        """Look up a page's OCR text in the cache"""
+        return self.cache.get(key) if key is not None else None
+
+    def _cache_put(self, key: Optional[str], text: str):
+        """Store a page's OCR text in the cache"""
+        if key is not None:
+            self.cache.put(key, text)
+
+    def iter_region_crops(self, images: Iterable[Image.Image],
+                          clipped: Optional[List[int]] = None) -> Iterator[Image.Image]:
+        """
+        Crop each page down to the regions the parser needs
+
+        The first page yields the PO number header followed by the line-item
+        table; later pages yield only their table. Boxes are page-relative
+        (left, top, right, bottom) fractions from Config.
+
+        Args:
+            images: PIL Image objects, one per page
+            clipped: Optional list that receives the 0-based index of every
+                     page whose table crop has ink along a cut edge, meaning
+                     line items may continue outside the box
+
+        Yields:
+            Cropped region images in reading order
+        """
+        for page_index, image in enumerate(images):
+            if page_index == 0:
+                boxes = [Config.OCR_HEADER_REGION, Config.OCR_TABLE_REGION]
+            else:
+                boxes = [Config.OCR_CONTINUATION_TABLE_REGION]
+
+            width, height = image.size
+            for box_index, (left, top, right, bottom) in enumerate(boxes):
+                crop = image.crop((
+                    round(left * width), round(top * height),
+                    round(right * width), round(bottom * height)
+                ))
+                # The table is always the last box on a page
+                is_table = box_index == len(boxes) - 1
+                if clipped is not None and is_table and self._has_edge_ink(crop, top > 0, bottom < 1):
+                    clipped.append(page_index)
+                yield crop
+
+    def _has_edge_ink(self, crop: Image.Image, check_top: bool, check_bottom: bool) -> bool:
+        """
+        Check whether text runs into the top or bottom edge of a region crop
+
+        Args:
+            crop: Region image
+            check_top: Look at the top edge (False when it is the page edge)
+            check_bottom: Look at the bottom edge (False when it is the page edge)
+
+        Returns:
+            True if either checked edge strip has more dark pixels than
+            Config.REGION_EDGE_INK_FRACTION allows
+        """
+        width, height = crop.size
+        strip = min(height, max(2, round(height * Config.REGION_EDGE_STRIP)))
+        strips = []
+        if check_top:
+            strips.append((0, 0, width, strip))
+        if check_bottom:
+            strips.append((0, height - strip, width, height))
+
+        for box in strips:
+            histogram = crop.crop(box).convert('L').histogram()
+            if sum(histogram[:128]) > Config.REGION_EDGE_INK_FRACTION * width * strip:
+                return True
+        return False
+
+    def is_parseable(self, text: Optional[str]) -> bool:
+        """
+        Check whether text has a PO number and at least one product line
+
+        Args:
+            text: OCR or embedded PDF text
+
+        Returns:
+            True if parse_document will find the PO number and products
+        """
+        if not text:
+            return False
+        return bool(
+            PO_NUMBER_RE.search(text)
+            and any(BLOCK_START_RE.match(line) for line in text.split('\n'))
+        )
+
+    def find_suspect_pages(self, page_texts: List[str]) -> List[int]:
+        """
+        Find pages whose OCR text doesn't parse cleanly and may need a higher DPI
+
+        The first page must contain the PO number. Every product block on a
+        page must have a product code and dimensions with plausible piece
+        counts and lengths. If the document has no products or no pieces at
+        all, every page is suspect.
+
+        Args:
+            page_texts: OCR text per page, in page order
+
+        Returns:
+            0-based indexes of suspect pages
+        """
+        suspect = []
+        total_pieces = 0
+        min_length, max_length = Config.PLAUSIBLE_LENGTH_RANGE
+
+        for page_index, text in enumerate(page_texts):
+            text = self._fix_quotes(text)
+            ok = page_index > 0 or self.extract_po_number(text) is not None
+
+            for block in self.extract_product_blocks(text):
+                parsed = self.parse_product_block(block)
+                if not parsed.product_code or not parsed.dimensions:
+                    ok = False
+                    continue
+
+                for dimension in parsed.dimensions.split(','):
+                    pieces, _, length = dimension.strip().rstrip("'").partition('/')
+                    if not (pieces.isdigit() and length.isdigit()
+                            and int(pieces) > 0 and min_length <= int(length) <= max_length):
+                        ok = False
+                        continue
+                    total_pieces += int(pieces)
+
+            if not ok:
+                suspect.append(page_index)
+
+        if total_pieces == 0:
+            return list(range(len(page_texts)))
+        return suspect
+
+    def accept_text_layer(self, text: Optional[str]) -> Optional[str]:
+        """
+        Check whether embedded PDF text can be parsed without OCR
+
+        Args:
+            text: Text read from the PDF's text layer
+
+        Returns:
+            Normalized text if it has a PO number and product lines, otherwise None
+        """
+        if not text:
+            return None
+
+        text = self._fix_quotes(text)
+        return text if self.is_parseable(text) else None
+
+    def _fix_quotes(self, text: str) -> str:
+        """
+        Normalize OCR'd quote characters to a plain apostrophe
+
+        Args:
+            text: Raw OCR text
+
+        Returns:
+            Text with quotes normalized
+        """
+        return QUOTES_RE.sub("'", text)
 
     def extract_po_number(self, text: str) -> Optional[str]:
         """
@@ -34,8 +440,7 @@ class OCRExtractor:
         Returns:
             PO number or None if not found
         """
-        po_pattern = r'LUMBER CO\.?\s+D(\d+)'
-        match = re.search(po_pattern, text)
+        match = PO_NUMBER_RE.search(text)
         if match:
             po_number = match.group(1).lstrip('0')
             return f'D{po_number}'
@@ -51,33 +456,9 @@ class OCRExtractor:
         Returns:
             List of product block strings
         """
-        lines = text.split('\n')
-        blocks = []
-        current_block = []
-        in_product_block = False
-
-        for line in lines:
-            # Check if this is the start of a product block
-            if re.match(r'^\d+\s+L[FE]\s+\d{6}-\d{4}-[A-Z]+', line):
-                if in_product_block and current_block:
-                    blocks.append('\n'.join(current_block))
-                current_block = [line]
-                in_product_block = True
-            elif in_product_block:
-                current_block.append(line)
-                # Check if this is the end of a product block
-                if re.search(r'\d+/\d+\'', line):
-                    blocks.append('\n'.join(current_block))
-                    in_product_block = False
-                    current_block = []
-
-        # Add any remaining block
-        if in_product_block and current_block:
-            blocks.append('\n'.join(current_block))
-
-        return blocks
-
-    def parse_product_block(self, block: str) -> Dict[str, Optional[str]]:
+        return list(POTextParser().iter_blocks(text.split('\n')))
+
+    def parse_product_block(self, block: str) -> LineItem:
         """
         Parse a single product block
 
@@ -85,64 +466,20 @@ class OCRExtractor:
             block: Product block text
 
         Returns:
-            Dictionary with product information
+            Line item with the block's product information
         """
-        result = {
-            'product_code': None,
-            'dimensions': None,
-            'size': None
-        }
-
-        # Extract product code
-        product_code_pattern = r'\b(\d{6}-\d{4}-[A-Z]+)\b'
-        code_match = re.search(product_code_pattern, block)
-        if code_match:
-            result['product_code'] = code_match.group(1)
-
-        # Extract dimensions
-        dimensions_pattern = r'(\d+/\d+\'(?:,\s*\d+/\d+\')*)'
-        dimensions_match = re.search(dimensions_pattern, block)
-        if dimensions_match:
-            result['dimensions'] = dimensions_match.group(1)
+        return POTextParser.parse_block(block)
 
-        # Extract size
-        size_pattern = r'^\s*([\d.]+\s*[Xx]\s*[\d.]+)'
-        size_match = re.search(size_pattern, block, re.MULTILINE)
-        if size_match:
-            result['size'] = size_match.group(1)
-
-        return result
-
-    def parse_document(self, text: str) -> Dict[str, List[Dict[str, Optional[str]]]]:
+    def parse_document(self, text: str) -> Dict[str, LineItemBatch]:
         """
-        Parse entire document
+        Parse entire document in a single pass over its lines
 
         Args:
             text: OCR text
 
         Returns:
-            Dictionary with PO number as key and list of products as value
-        """
-        po_number = self.extract_po_number(text)
-        if not po_number:
-            po_number = 'UNKNOWN'
-
-        blocks = self.extract_product_blocks(text)
-        products = []
-
-        for block in blocks:
-            parsed = self.parse_product_block(block)
-            if parsed['product_code']:
-                # Expand products with multiple dimensions
-                if parsed['dimensions']:
-                    dimensions = [dim.strip() for dim in parsed['dimensions'].split(',')]
-                    for dimension in dimensions:
-                        products.append({
-                            'product_code': parsed['product_code'],
-                            'dimensions': dimension,
-                            'size': parsed['size']
-                        })
-                else:
-                    products.append(parsed)
-
-        return {po_number: products}
\ No newline at end of file
+            Dictionary with PO number as key and its line items as value
+        """
+        parser = POTextParser()
+        products = LineItemBatch(parser.iter_products(text.split('\n')))
+        return {parser.po_number or 'UNKNOWN': products}
@@ -3,27 +3,66 @@ PDF Processing Module
 Handles PDF to image conversion and image manipulation
 """
 
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Optional
 from PIL import Image
-from pdf2image import convert_from_path
-import tempfile
-import shutil
+from pdf2image import convert_from_path, pdfinfo_from_path
 
 
 class PDFProcessor:
-    def __init__(self, dpi: int = 300, poppler_path=None):
+    def __init__(self, dpi: int = 300, poppler_path=None, debug_dir: Optional[str] = None,
+                 async_debug: bool = True):
         """
         Initialize PDF processor
 
         Args:
             dpi: Resolution for PDF to image conversion
             poppler_path: Path to Poppler binaries (for Windows)
+            debug_dir: Directory to save page images in for debugging (None = never write them)
+            async_debug: Write debug page images on a background thread
         """
         self.dpi = dpi
         self.poppler_path = poppler_path
-        self.temp_dir = None
+        self.debug_dir = debug_dir
+        self.async_debug = async_debug
         self.temp_files = []
+        self._debug_writer = None
+        self._debug_writes = []
+
+    def extract_text_layer(self, pdf_path: str, timeout: int = 30) -> Optional[str]:
+        """
+        Read the embedded text layer of a born-digital PDF with pdftotext
+
+        Args:
+            pdf_path: Path to PDF file
+            timeout: Seconds to wait for pdftotext
+
+        Returns:
+            Extracted text, or None if the PDF has no usable text layer
+        """
+        pdftotext = os.path.join(self.poppler_path, 'pdftotext') if self.poppler_path else 'pdftotext'
+        try:
+            result = subprocess.run(
+                [pdftotext, '-layout', '-enc', 'UTF-8', str(pdf_path), '-'],
+                capture_output=True,
+                timeout=timeout,
+                # Don't flash a console window from the windowed exe
+                creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+        if result.returncode != 0:
+            return None
+
+        text = result.stdout.decode('utf-8', errors='replace')
+        # Pages are separated by form feeds and -layout indents columns
+        lines = (line.strip() for line in text.replace('\f', '\n').splitlines())
+        text = '\n'.join(lines)
+        return text if text.strip() else None
 
     def convert_pdf_to_images(self, pdf_path: str) -> List[Image.Image]:
         """
@@ -35,35 +74,97 @@ class PDFProcessor:
         Returns:
             List of PIL Image objects, one per page
         """
-        # Create temporary directory for intermediate files
-        self.temp_dir = tempfile.mkdtemp(prefix="po_processor_")
-        temp_path = Path(self.temp_dir)
+        try:
+            images = convert_from_path(pdf_path, dpi=self.dpi, poppler_path=self.poppler_path)
+        except Exception as e:
+            raise Exception(f"Failed to convert PDF to images: {str(e)}")
+
+        for page_number, img in enumerate(images, start=1):
+            img.info['dpi'] = (self.dpi, self.dpi)
+            self._save_debug_image(pdf_path, page_number, img)
+
+        return images
 
-        # Convert PDF to images with poppler_path if provided
+    def page_count(self, pdf_path: str) -> int:
+        """
+        Read a PDF's page count without rasterizing it
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            Number of pages
+        """
         try:
-            if self.poppler_path:
+            return pdfinfo_from_path(pdf_path, poppler_path=self.poppler_path)["Pages"]
+        except Exception as e:
+            raise Exception(f"Failed to read PDF page count: {str(e)}")
+
+    def iter_pdf_pages(self, pdf_path: str, window: int = 2) -> Iterator[Image.Image]:
+        """
+        Rasterize a PDF a few pages at a time, yielding one page image at a time
+
+        Only the current window of pages is held in memory, so peak memory
+        stays flat as the page count grows.
+
+        Args:
+            pdf_path: Path to PDF file
+            window: Number of pages rasterized per pdftoppm call
+
+        Yields:
+            PIL Image objects in page order
+        """
+        page_count = self.page_count(pdf_path)
+
+        for first_page in range(1, page_count + 1, window):
+            last_page = min(first_page + window - 1, page_count)
+            try:
                 images = convert_from_path(
                     pdf_path,
                     dpi=self.dpi,
+                    first_page=first_page,
+                    last_page=last_page,
                     poppler_path=self.poppler_path
                 )
-            else:
-                images = convert_from_path(pdf_path, dpi=self.dpi)
-        except Exception as e:
-            # Clean up temp directory if conversion fails
-            if self.temp_dir:
-                self.cleanup_temp_files()
-            raise Exception(f"Failed to convert PDF to images: {str(e)}")
+            except Exception as e:
+                raise Exception(f"Failed to convert PDF pages {first_page}-{last_page} to images: {str(e)}")
+
+            # Hand pages over one by one so the window doesn't keep them alive
+            images.reverse()
+            page_number = first_page
+            while images:
+                img = images.pop()
+                img.info['dpi'] = (self.dpi, self.dpi)
+                self._save_debug_image(pdf_path, page_number, img)
+                page_number += 1
+                yield img
+
+    def convert_pages(self, pdf_path: str, page_numbers: List[int]) -> Iterator[Image.Image]:
+        """
+        Rasterize only the given pages, one at a time
 
-        # Save images temporarily if needed for debugging
-        saved_images = []
-        for i, img in enumerate(images):
-            temp_file = temp_path / f"page_{i}.jpg"
-            img.save(temp_file, 'JPEG')
-            self.temp_files.append(temp_file)
-            saved_images.append(img)
+        Args:
+            pdf_path: Path to PDF file
+            page_numbers: 1-based page numbers
 
-        return saved_images
+        Yields:
+            PIL Image objects in the order requested
+        """
+        for page_number in page_numbers:
+            try:
+                img = convert_from_path(
+                    pdf_path,
+                    dpi=self.dpi,
+                    first_page=page_number,
+                    last_page=page_number,
+                    poppler_path=self.poppler_path
+                )[0]
+            except Exception as e:
+                raise Exception(f"Failed to convert PDF page {page_number} to an image: {str(e)}")
+
+            img.info['dpi'] = (self.dpi, self.dpi)
+            self._save_debug_image(pdf_path, page_number, img)
+            yield img
 
     def combine_images_vertically(self, images: List[Image.Image]) -> Image.Image:
         """
@@ -96,14 +197,41 @@ class PDFProcessor:
 
         return combined
 
+    def _save_debug_image(self, pdf_path: str, page_number: int, img: Image.Image):
+        """
+        Save a page image for debugging when a debug directory is configured
+
+        Args:
+            pdf_path: Path of the PDF the page came from
+            page_number: 1-based page number
+            img: Page image
+        """
+        if not self.debug_dir:
+            return
+
+        page_dir = Path(self.debug_dir) / Path(pdf_path).stem
+        page_dir.mkdir(parents=True, exist_ok=True)
+        debug_file = page_dir / f"page_{page_number}.jpg"
+        self.temp_files.append(debug_file)
+
+        if not self.async_debug:
+            img.save(debug_file, 'JPEG')
+            return
+
+        if self._debug_writer is None:
+            self._debug_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="debug_images")
+        self._debug_writes.append(self._debug_writer.submit(img.save, debug_file, 'JPEG'))
+
     def cleanup_temp_files(self):
-        """Clean up temporary files and directory"""
-        if self.temp_dir and Path(self.temp_dir).exists():
+        """Wait for pending debug image writes and stop the writer thread"""
+        for write in self._debug_writes:
             try:
-                shutil.rmtree(self.temp_dir)
+                write.result()
             except Exception as e:
-                # Sometimes Windows holds onto files, just log the error
-                print(f"Warning: Could not fully clean up temp files: {e}")
-            finally:
-                self.temp_dir = None
-                self.temp_files = []
\ No newline at end of file
+                # A failed debug write must never fail the PO itself
+                print(f"Warning: Could not write debug image: {e}")
+
+        if self._debug_writer is not None:
+            self._debug_writer.shutdown()
+            self._debug_writer = None
+        self._debug_writes = []
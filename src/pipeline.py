@@ -0,0 +1,528 @@
+"""
+Pipeline Module
+Runs the complete PDF to Excel pipeline with a preloaded master list
+"""
+
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+from .pdf_processor import PDFProcessor
+from .ocr_extractor import OCRExtractor
+from .product_matcher import ProductMatcher
+from .excel_generator import ExcelGenerator, ConsolidatedReport, SheetLocation
+from .line_items import LineItemBatch
+from .ocr_cache import OCRCache
+from .config import Config
+from .resource_usage import peak_rss_bytes, format_bytes
+from .instrumentation import RunMetrics
+
+
+class ProcessingCancelled(Exception):
+    """Raised inside a run whose JobControl was cancelled"""
+
+
+class JobControl:
+    """Lets the caller cancel a run and follow its page progress"""
+
+    def __init__(self, on_page: Optional[Callable[[int, Optional[int]], None]] = None):
+        """
+        Initialize job control
+
+        Args:
+            on_page: Optional callback receiving (pages done, total pages or None)
+                     after each page is OCRed; it runs on the processing thread
+        """
+        self.on_page = on_page
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Ask the run to stop at its next page or stage boundary"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self):
+        """Raise ProcessingCancelled if the run was cancelled"""
+        if self._cancelled.is_set():
+            raise ProcessingCancelled("Cancelled")
+
+    def page_done(self, done: int, total: Optional[int]):
+        """Report page progress"""
+        if self.on_page is not None:
+            self.on_page(done, total)
+
+
+class ReportNames:
+    """
+    Hands out report paths that are unique within a batch
+
+    Two PDFs can yield the same PO number, such as a resent or split PO or
+    two unreadable ones that both come out as UNKNOWN. Jobs running at the
+    same time would otherwise write the same file and lose a report, so
+    repeats get a " (2)", " (3)" ... suffix. Safe to share between threads.
+    """
+
+    def __init__(self):
+        self._used = set()
+        self._lock = threading.Lock()
+
+    def reserve(self, output_dir: str, po_number: str) -> Path:
+        """
+        Claim the report path for a PO
+
+        Args:
+            output_dir: Directory for the report
+            po_number: Purchase order number
+
+        Returns:
+            Report path no other job in the batch has been given
+        """
+        base = f"Disdero #{po_number}"
+        name = base
+        suffix = 1
+        with self._lock:
+            # Windows compares file names case-insensitively
+            while str(Path(output_dir) / name).lower() in self._used:
+                suffix += 1
+                name = f"{base} ({suffix})"
+            self._used.add(str(Path(output_dir) / name).lower())
+        return Path(output_dir) / f"{name}.xlsx"
+
+
+class POPipeline:
+    def __init__(self, master_file: str, dpi: int = Config.DEFAULT_DPI, poppler_path=None,
+                 ocr_workers: Optional[int] = Config.OCR_WORKERS,
+                 use_text_layer: bool = Config.USE_TEXT_LAYER,
+                 stream_pages: bool = Config.STREAM_PAGES,
+                 debug_dir: Optional[str] = Config.DEBUG_IMAGES_DIR,
+                 preprocess: str = Config.PREPROCESS,
+                 region_ocr: bool = Config.REGION_OCR,
+                 ocr_cache: bool = Config.OCR_CACHE_ENABLED,
+                 ocr_backend: str = Config.OCR_BACKEND,
+                 adaptive_dpi: bool = Config.ADAPTIVE_DPI,
+                 matcher: Optional[ProductMatcher] = None,
+                 ocr_extractor: Optional[OCRExtractor] = None,
+                 metrics_log: Optional[str] = Config.METRICS_LOG):
+        """
+        Initialize pipeline, loading the master product list once
+
+        Args:
+            master_file: Path to master product Excel file
+            dpi: Resolution for PDF to image conversion
+            poppler_path: Path to Poppler binaries (for Windows)
+            ocr_workers: Number of processes used for page-parallel OCR
+            use_text_layer: Try the PDF's embedded text before rasterizing and OCR
+            stream_pages: Rasterize a few pages at a time instead of the whole PDF
+            debug_dir: Directory to save page images in for debugging (None = never)
+            preprocess: Name of the Config.PREPROCESS_PRESETS entry applied before OCR
+            region_ocr: OCR only the header and line-item regions, falling back to full pages
+            ocr_cache: Serve repeat pages from the persistent OCR cache
+            ocr_backend: OCR backend name, or "auto" to prefer an in-process engine
+            adaptive_dpi: Start at the lowest Config.DPI_TIERS resolution and only
+                          re-rasterize pages that fail to parse (ignores dpi and region_ocr)
+            matcher: Already loaded matcher to share instead of loading master_file again
+            ocr_extractor: OCR extractor to share with other pipelines, so they use one
+                           worker pool; ocr_workers, preprocess, ocr_cache and ocr_backend
+                           are then ignored and the caller closes it
+            metrics_log: JSON Lines file each run's stage metrics are appended to (None = don't log)
+        """
+        self.dpi = dpi
+        self.use_text_layer = use_text_layer
+        self.stream_pages = stream_pages
+        self.debug_dir = debug_dir
+        self.region_ocr = region_ocr
+        self.adaptive_dpi = adaptive_dpi
+        self.poppler_path = poppler_path
+        self.metrics_log = metrics_log
+        self._owns_ocr_extractor = ocr_extractor is None
+        self.ocr_extractor = ocr_extractor or self.create_ocr_extractor(
+            ocr_workers, preprocess, ocr_cache, ocr_backend
+        )
+        self.matcher = matcher or ProductMatcher(master_file)
+        self.excel_generator = ExcelGenerator()
+
+    @classmethod
+    def create_ocr_extractor(cls, ocr_workers: Optional[int] = Config.OCR_WORKERS,
+                             preprocess: str = Config.PREPROCESS,
+                             ocr_cache: bool = Config.OCR_CACHE_ENABLED,
+                             ocr_backend: str = Config.OCR_BACKEND) -> OCRExtractor:
+        """
+        Create the OCR extractor a pipeline would, for sharing between pipelines
+
+        Args:
+            ocr_workers: Number of processes used for page-parallel OCR
+            preprocess: Name of the Config.PREPROCESS_PRESETS entry applied before OCR
+            ocr_cache: Serve repeat pages from the persistent OCR cache
+            ocr_backend: OCR backend name, or "auto" to prefer an in-process engine
+
+        Returns:
+            New OCR extractor
+        """
+        return OCRExtractor(
+            workers=ocr_workers,
+            preprocessor=cls._create_preprocessor(preprocess),
+            cache=OCRCache(max_bytes=Config.OCR_CACHE_MAX_MB * 1024 * 1024) if ocr_cache else None,
+            backend=ocr_backend
+        )
+
+    @staticmethod
+    def _create_preprocessor(preset: str):
+        """Build a preprocessing preset, importing OpenCV only when the preset needs it"""
+        if Config.PREPROCESS_PRESETS.get(preset, ...) is None:
+            return None
+        from .image_preprocessor import ImagePreprocessor
+        return ImagePreprocessor.from_preset(preset)
+
+    def close(self):
+        """Stop the OCR worker processes and release loaded engines, unless the extractor is shared"""
+        if self._owns_ocr_extractor:
+            self.ocr_extractor.close()
+
+    def process(self, pdf_path: str, output_dir: str,
+                progress: Optional[Callable[[str], None]] = None,
+                metrics: Optional[RunMetrics] = None,
+                control: Optional[JobControl] = None,
+                report_names: Optional[ReportNames] = None) -> Tuple[str, Path]:
+        """
+        Process one purchase order PDF into an Excel report
+
+        Args:
+            pdf_path: Path to the purchase order PDF
+            output_dir: Directory for the generated report
+            progress: Optional callback receiving stage messages
+            metrics: Optional RunMetrics filled in with per-stage measurements
+            control: Optional JobControl for cancellation and page progress
+            report_names: Names shared by a batch, so jobs with the same PO
+                          number don't write the same file
+
+        Returns:
+            Tuple of PO number and output file path
+        """
+        progress = progress or (lambda message: None)
+        with self._measured_run(pdf_path, metrics) as metrics:
+            po_number, matched_products = self.extract(pdf_path, progress, metrics, control)
+
+            # Step 5: Generate Excel report
+            if control is not None:
+                control.check()
+            progress(f"Generating Excel report for PO #{po_number}")
+            if report_names is not None:
+                output_file = report_names.reserve(output_dir, po_number)
+            else:
+                output_file = Path(output_dir) / f"Disdero #{po_number}.xlsx"
+            with metrics.stage('write'):
+                self.excel_generator.generate_report(po_number, matched_products, str(output_file))
+
+        return po_number, output_file
+
+    def process_into(self, pdf_path: str, report: ConsolidatedReport,
+                     progress: Optional[Callable[[str], None]] = None,
+                     metrics: Optional[RunMetrics] = None,
+                     control: Optional[JobControl] = None) -> Tuple[str, SheetLocation]:
+        """
+        Process one purchase order PDF into a sheet of a consolidated workbook
+
+        Args:
+            pdf_path: Path to the purchase order PDF
+            report: Open consolidated workbook shared by the batch
+            progress: Optional callback receiving stage messages
+            metrics: Optional RunMetrics filled in with per-stage measurements
+            control: Optional JobControl for cancellation and page progress
+
+        Returns:
+            Tuple of PO number and the workbook file and sheet it was written to
+        """
+        progress = progress or (lambda message: None)
+        with self._measured_run(pdf_path, metrics) as metrics:
+            po_number, matched_products = self.extract(pdf_path, progress, metrics, control)
+
+            if control is not None:
+                control.check()
+            progress(f"Adding PO #{po_number} to the combined workbook")
+            with metrics.stage('write'):
+                location = report.add_po(po_number, matched_products)
+
+        return po_number, location
+
+    def process_to_items(self, pdf_path: str,
+                         progress: Optional[Callable[[str], None]] = None,
+                         metrics: Optional[RunMetrics] = None,
+                         control: Optional[JobControl] = None) -> Tuple[str, LineItemBatch]:
+        """
+        Process one purchase order PDF into matched line items, without a report
+
+        Args:
+            pdf_path: Path to the purchase order PDF
+            progress: Optional callback receiving stage messages
+            metrics: Optional RunMetrics filled in with per-stage measurements
+            control: Optional JobControl for cancellation and page progress
+
+        Returns:
+            Tuple of PO number and matched line items
+        """
+        with self._measured_run(pdf_path, metrics) as metrics:
+            return self.extract(pdf_path, progress, metrics, control)
+
+    @contextmanager
+    def _measured_run(self, pdf_path: str, metrics: Optional[RunMetrics]):
+        """Provide a run's metrics, recording failures and logging the run at the end"""
+        metrics = metrics or RunMetrics(pdf_path)
+        try:
+            yield metrics
+        except Exception as e:
+            metrics.error = str(e)
+            raise
+        finally:
+            if self.metrics_log:
+                metrics.append_to(self.metrics_log)
+
+    def extract(self, pdf_path: str,
+                progress: Optional[Callable[[str], None]] = None,
+                metrics: Optional[RunMetrics] = None,
+                control: Optional[JobControl] = None) -> Tuple[str, LineItemBatch]:
+        """
+        Read, parse and match one purchase order PDF
+
+        Args:
+            pdf_path: Path to the purchase order PDF
+            progress: Optional callback receiving stage messages
+            metrics: Optional RunMetrics filled in with per-stage measurements
+            control: Optional JobControl for cancellation and page progress
+
+        Returns:
+            Tuple of PO number and matched products
+        """
+        progress = progress or (lambda message: None)
+        metrics = metrics or RunMetrics(pdf_path)
+        control = control or JobControl()
+        control.check()
+
+        # PDFProcessor tracks per-document debug writes, so each run gets its own
+        pdf_processor = PDFProcessor(dpi=self.dpi, poppler_path=self.poppler_path,
+                                     debug_dir=self.debug_dir)
+        try:
+            ocr_text = None
+            if self.use_text_layer:
+                # Born-digital POs can skip rasterization and OCR entirely
+                progress(f"Reading embedded text: {pdf_path}")
+                with metrics.stage('text_layer'):
+                    ocr_text = self.ocr_extractor.accept_text_layer(
+                        pdf_processor.extract_text_layer(pdf_path)
+                    )
+
+            if ocr_text is None:
+                # Steps 1-2: Rasterize and OCR
+                cache = self.ocr_extractor.cache
+                cache_before = cache.stats() if cache else None
+                # Drop anything left over from a failed run on this thread
+                self.ocr_extractor.take_preprocess_time()
+                with metrics.stage('ocr'):
+                    if self.adaptive_dpi:
+                        # Rasterizes at its own DPI tiers, so it builds its own processors
+                        ocr_text = self._ocr_pdf_adaptive(pdf_path, progress, metrics, control)
+                    else:
+                        ocr_text = self._ocr_pdf(pdf_processor, pdf_path, progress, metrics, control)
+                metrics.add('preprocess', *self.ocr_extractor.take_preprocess_time())
+                if cache:
+                    # Counters are shared across runs, so report this run's delta
+                    cache_after = cache.stats()
+                    progress(f"OCR cache: {cache_after['hits'] - cache_before['hits']} hit(s), "
+                             f"{cache_after['misses'] - cache_before['misses']} miss(es)")
+                progress(f"Peak memory: {format_bytes(peak_rss_bytes())}")
+        finally:
+            # Finish any debug image writes
+            pdf_processor.cleanup_temp_files()
+
+        # Step 3: Parse OCR results
+        control.check()
+        progress("Parsing document...")
+        with metrics.stage('parse'):
+            parsed_data = self.ocr_extractor.parse_document(ocr_text)
+
+        # Step 4: Match products with master list
+        control.check()
+        progress("Matching products...")
+        po_number, products = list(parsed_data.items())[0]
+        metrics.po_number = po_number
+        with metrics.stage('match'):
+            matched_products = self.matcher.match_products(products, progress)
+        return po_number, matched_products
+
+    def _ocr_pdf(self, pdf_processor: PDFProcessor, pdf_path: str,
+                 progress: Callable[[str], None], metrics: RunMetrics, control: JobControl) -> str:
+        """
+        Rasterize and OCR a PDF, using region OCR when enabled
+
+        Args:
+            pdf_processor: PDF processor for this document
+            pdf_path: Path to the purchase order PDF
+            progress: Callback receiving stage messages
+            metrics: Run metrics; rasterization is recorded as its own stage
+            control: Job control for cancellation and page progress
+
+        Returns:
+            OCR text for the whole document
+        """
+        if self.region_ocr:
+            return self._ocr_pdf_regions(pdf_processor, pdf_path, progress, metrics, control)
+
+        if self.stream_pages:
+            # Rasterize in small windows, OCRing and freeing each page as we go
+            progress(f"Converting and OCRing PDF {Config.RASTER_WINDOW} page(s) at a time: {pdf_path}")
+            page_count = pdf_processor.page_count(pdf_path)
+            return self.ocr_extractor.join_page_texts(self._ocr_pages(
+                self._iter_pages(pdf_processor, pdf_path, metrics), page_count, control
+            ))
+
+        progress(f"Converting PDF: {pdf_path}")
+        with metrics.stage('rasterize'):
+            images = pdf_processor.convert_pdf_to_images(pdf_path)
+        progress(f"Performing OCR on {len(images)} page(s)...")
+        return self.ocr_extractor.join_page_texts(self._ocr_pages(images, len(images), control))
+
+    def _ocr_pdf_regions(self, pdf_processor: PDFProcessor, pdf_path: str,
+                         progress: Callable[[str], None], metrics: RunMetrics, control: JobControl) -> str:
+        """
+        OCR only the header and line-item regions, re-running whole pages
+        whose region text looks incomplete
+
+        A page is re-run on the full image when its region text fails the
+        same checks adaptive DPI applies (PO number on the first page, every
+        product block with a code and plausible dimensions), or when text
+        runs into the cut edge of its table crop, since line items outside
+        the box would otherwise be dropped without a trace.
+
+        Args:
+            pdf_processor: PDF processor for this document
+            pdf_path: Path to the purchase order PDF
+            progress: Callback receiving stage messages
+            metrics: Run metrics; rasterization is recorded as its own stage
+            control: Job control for cancellation and page progress
+
+        Returns:
+            OCR text for the whole document
+        """
+        progress(f"Performing OCR on header and line-item regions: {pdf_path}")
+        images = None
+        if not self.stream_pages:
+            # Keep the pages so a fallback doesn't have to rasterize again
+            with metrics.stage('rasterize'):
+                images = pdf_processor.convert_pdf_to_images(pdf_path)
+            page_count = len(images)
+            pages = images
+        else:
+            page_count = pdf_processor.page_count(pdf_path)
+            pages = self._iter_pages(pdf_processor, pdf_path, metrics)
+
+        clipped: List[int] = []
+        # The first page contributes a header and a table crop
+        region_texts = self._ocr_pages(
+            self.ocr_extractor.iter_region_crops(pages, clipped), page_count + 1, control
+        )
+        page_texts = ['\n'.join(region_texts[:2])] + region_texts[2:]
+
+        retry = sorted(set(self.ocr_extractor.find_suspect_pages(page_texts)) | set(clipped))
+        if not retry:
+            return self.ocr_extractor.join_page_texts(page_texts)
+
+        if len(retry) == len(page_texts):
+            progress("Region OCR missed the PO number or line items, retrying on full pages...")
+            if images is None:
+                images = self._iter_pages(pdf_processor, pdf_path, metrics)
+        else:
+            progress(f"Region OCR looks incomplete on page(s) {', '.join(str(i + 1) for i in retry)}, "
+                     f"retrying them on full pages...")
+            if images is not None:
+                images = [images[i] for i in retry]
+            else:
+                images = metrics.iter_stage('rasterize', pdf_processor.convert_pages(pdf_path, [i + 1 for i in retry]))
+
+        full_texts = self._ocr_pages(images, len(retry), control, rerun_progress=progress)
+        for page_index, text in zip(retry, full_texts):
+            page_texts[page_index] = text
+        return self.ocr_extractor.join_page_texts(page_texts)
+
+    def _ocr_pdf_adaptive(self, pdf_path: str, progress: Callable[[str], None],
+                          metrics: RunMetrics, control: JobControl) -> str:
+        """
+        OCR every page at the lowest DPI tier, escalating only suspect pages
+
+        Args:
+            pdf_path: Path to the purchase order PDF
+            progress: Callback receiving stage messages
+            metrics: Run metrics; rasterization is recorded as its own stage
+            control: Job control for cancellation and page progress
+
+        Returns:
+            OCR text for the whole document
+        """
+        tiers = sorted(Config.DPI_TIERS)
+        pdf_processor = PDFProcessor(dpi=tiers[0], poppler_path=self.poppler_path, debug_dir=self.debug_dir)
+        try:
+            progress(f"Converting and OCRing PDF at {tiers[0]} DPI: {pdf_path}")
+            page_count = pdf_processor.page_count(pdf_path)
+            page_texts = self._ocr_pages(
+                self._iter_pages(pdf_processor, pdf_path, metrics), page_count, control
+            )
+        finally:
+            pdf_processor.cleanup_temp_files()
+
+        page_dpis = [tiers[0]] * len(page_texts)
+        for dpi in tiers[1:]:
+            suspect = self.ocr_extractor.find_suspect_pages(page_texts)
+            if not suspect:
+                break
+
+            progress(f"Re-running OCR at {dpi} DPI on page(s) {', '.join(str(i + 1) for i in suspect)}...")
+            pdf_processor = PDFProcessor(dpi=dpi, poppler_path=self.poppler_path, debug_dir=self.debug_dir)
+            try:
+                pages = metrics.iter_stage(
+                    'rasterize', pdf_processor.convert_pages(pdf_path, [i + 1 for i in suspect])
+                )
+                # Pages were already counted by the first pass, so report this one as stage messages
+                rerun = self._ocr_pages(pages, len(suspect), control, rerun_progress=progress)
+                for page_index, text in zip(suspect, rerun):
+                    page_texts[page_index] = text
+                    page_dpis[page_index] = dpi
+            finally:
+                pdf_processor.cleanup_temp_files()
+
+        progress(f"DPI per page: {', '.join(str(dpi) for dpi in page_dpis)}")
+        return self.ocr_extractor.join_page_texts(page_texts)
+
+    def _ocr_pages(self, pages: Iterable, total: Optional[int], control: JobControl,
+                   rerun_progress: Optional[Callable[[str], None]] = None) -> List[str]:
+        """
+        OCR pages in order, reporting progress and stopping on cancellation
+
+        Args:
+            pages: Page or region images
+            total: Number of images, if known
+            control: Job control for cancellation and page progress
+            rerun_progress: For a second pass over pages the job already
+                            counted, receives "page N of M" stage messages in
+                            place of page progress, so the job's progress
+                            never moves backwards
+
+        Returns:
+            Raw OCR text per image
+        """
+        texts = []
+        # Pages are pulled lazily, so stopping here also stops rasterizing and submitting more
+        for text in self.ocr_extractor.iter_page_texts(pages):
+            texts.append(text)
+            if rerun_progress is None:
+                control.page_done(len(texts), total)
+            else:
+                rerun_progress(f"Re-running OCR: page {len(texts)} of {total}")
+            control.check()
+        return texts
+
+    def _iter_pages(self, pdf_processor: PDFProcessor, pdf_path: str, metrics: RunMetrics):
+        """Stream pages in Config.RASTER_WINDOW sized windows, timing them as rasterization"""
+        return metrics.iter_stage(
+            'rasterize', pdf_processor.iter_pdf_pages(pdf_path, window=Config.RASTER_WINDOW)
+        )
@@ -0,0 +1,111 @@
+"""
+PO Text Parsing Module
+Single-pass parser that turns OCR text lines into product records
+"""
+
+import re
+from typing import Iterable, Iterator, List, Optional
+from .config import Config
+from .line_items import LineItem
+
+PO_NUMBER_RE = re.compile(Config.PO_NUMBER_PATTERN)
+PRODUCT_CODE_RE = re.compile(Config.PRODUCT_CODE_PATTERN)
+DIMENSIONS_RE = re.compile(Config.DIMENSIONS_PATTERN)
+SIZE_RE = re.compile(Config.SIZE_PATTERN, re.MULTILINE)
+BLOCK_START_RE = re.compile(Config.PRODUCT_BLOCK_START_PATTERN)
+BLOCK_END_RE = re.compile(Config.PRODUCT_BLOCK_END_PATTERN)
+
+
+class POTextParser:
+    """
+    State machine over OCR lines
+
+    Lines are consumed once, in order. A product block opens on a line
+    matching PRODUCT_BLOCK_START_PATTERN and closes on the next line
+    containing a dimension; each closed block is parsed and its products
+    are yielded right away. The PO number is recorded as soon as it is seen.
+    """
+
+    def __init__(self):
+        self.po_number: Optional[str] = None
+
+    def iter_products(self, lines: Iterable[str]) -> Iterator[LineItem]:
+        """
+        Parse lines into products, expanding blocks with several dimensions
+
+        Args:
+            lines: OCR text lines
+
+        Yields:
+            Line items with product_code, dimensions and size
+        """
+        for block in self.iter_blocks(lines):
+            parsed = self.parse_block(block)
+            if not parsed.product_code:
+                continue
+
+            # Expand products with multiple dimensions
+            if parsed.dimensions:
+                for dimension in parsed.dimensions.split(','):
+                    yield LineItem(parsed.product_code, dimension.strip(), parsed.size)
+            else:
+                yield parsed
+
+    def iter_blocks(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Group lines into product blocks, recording the PO number on the way
+
+        Args:
+            lines: OCR text lines
+
+        Yields:
+            Product block strings
+        """
+        current_block: List[str] = []
+        previous_line = ''
+
+        for line in lines:
+            line = line.rstrip('\n')
+
+            if self.po_number is None:
+                # The header can wrap, so look across the line break too
+                match = PO_NUMBER_RE.search(f"{previous_line}\n{line}")
+                if match:
+                    self.po_number = f"D{match.group(1).lstrip('0')}"
+                # Blank lines in between are kept so the window still spans them
+                previous_line = line if line.strip() else f"{previous_line}\n{line}"
+
+            if BLOCK_START_RE.match(line):
+                if current_block:
+                    yield '\n'.join(current_block)
+                current_block = [line]
+            elif current_block:
+                current_block.append(line)
+                if BLOCK_END_RE.search(line):
+                    yield '\n'.join(current_block)
+                    current_block = []
+
+        # Add any remaining block
+        if current_block:
+            yield '\n'.join(current_block)
+
+    @staticmethod
+    def parse_block(block: str) -> LineItem:
+        """
+        Parse a single product block
+
+        Args:
+            block: Product block text
+
+        Returns:
+            Line item whose dimensions may list several, comma separated
+        """
+        code_match = PRODUCT_CODE_RE.search(block)
+        dimensions_match = DIMENSIONS_RE.search(block)
+        size_match = SIZE_RE.search(block)
+
+        return LineItem(
+            product_code=code_match.group(1) if code_match else None,
+            dimensions=dimensions_match.group(1) if dimensions_match else None,
+            size=size_match.group(1) if size_match else None
+        )
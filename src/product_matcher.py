@@ -3,20 +3,187 @@ Product Matching Module
 Matches extracted products with master product list
 """
 
+import hashlib
+import json
+import os
+import pickle
 import re
-from typing import List, Dict, Any, Optional
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, Any, Iterable, Mapping, NamedTuple, Optional, Tuple
 import pandas as pd
+from .code_index import ProductCodeIndex
+from .config import Config
+from .line_items import LineItem, LineItemBatch
+from .runtime_config import user_cache_dir
+
+# Bump whenever the normalized master table or cache file layout changes
+CACHE_FORMAT_VERSION = 3
+# First bytes of a master list cache file, ahead of its JSON header line
+CACHE_MAGIC = b"DISDERO-MASTER-CACHE "
+
+NON_DIGIT_RE = re.compile(r"[^\d]")
+PER_UNIT_RE = re.compile(r"(\d+)PC")
+
+
+def master_cache_dir() -> Path:
+    """Directory holding normalized master list caches, one per spreadsheet version"""
+    return user_cache_dir() / 'master'
+
+
+class MasterRecord(NamedTuple):
+    """Master list fields needed to fill in a matched PO line"""
+    sku: str
+    description: str
+    quantity: str
+    per_unit: int = 0  # Pieces per unit from "NPC" in the quantity, 0 when absent
+
+
+EMPTY_RECORD = MasterRecord(sku="", description="", quantity="")
 
 
 class ProductMatcher:
-    def __init__(self, master_file: str):
+    """
+    Matches PO lines against the master product list
+
+    All normalization happens once, when the master list is loaded. Lookups
+    only read the frozen index and code index afterwards, so one matcher can
+    be shared by any number of threads.
+    """
+
+    def __init__(self, master_file: str, use_cache: bool = True):
         """
         Initialize product matcher with master product list
 
         Args:
             master_file: Path to master product Excel file
+            use_cache: Load the normalized master list from its binary cache when valid
+        """
+        if use_cache:
+            self.master_df = self._load_cached_master_list(master_file)
+        else:
+            self.master_df = self._load_master_list(master_file)
+
+        self.index = self._build_index(self.master_df)
+        self.code_index = ProductCodeIndex(code for code, _ in self.index)
+
+    def _load_cached_master_list(self, file_path: str) -> pd.DataFrame:
+        """
+        Load the normalized master list from the per-user cache, rebuilding
+        the cache entry when the spreadsheet content has changed
+
+        Entries are named by the spreadsheet's content hash rather than its
+        path, so a master list unpacked to a fresh temp directory on every
+        launch (the onefile build) or installed read-only still hits the
+        cache. Hashing the spreadsheet is far cheaper than parsing it.
+
+        Args:
+            file_path: Path to Excel file
+
+        Returns:
+            Processed DataFrame
+        """
+        content_hash = self._hash_file(file_path)
+        cache_file = master_cache_dir() / f"{content_hash}{Config.MASTER_CACHE_SUFFIX}"
+        master_df = self._read_cache(cache_file, content_hash)
+        if master_df is None:
+            master_df = self._load_master_list(file_path)
+            self._write_cache(cache_file, content_hash, master_df)
+        self._prune_cache(cache_file)
+        return master_df
+
+    def _prune_cache(self, keep: Path):
+        """
+        Delete cache entries for other versions of the spreadsheet
+
+        Args:
+            keep: Cache file of the master list just loaded
+        """
+        try:
+            stale = [entry for entry in keep.parent.glob(f"*{Config.MASTER_CACHE_SUFFIX}") if entry != keep]
+        except OSError:
+            return
+        for entry in stale:
+            try:
+                entry.unlink()
+            except OSError:
+                # In use or already removed by another process, try again next load
+                pass
+
+    def _cache_header(self, content_hash: str) -> bytes:
+        """Header line identifying a cache entry and the versions that wrote it"""
+        header = {
+            'format': CACHE_FORMAT_VERSION,
+            'pandas_version': pd.__version__,
+            'sha256': content_hash,
+        }
+        return CACHE_MAGIC + json.dumps(header, sort_keys=True).encode('utf-8') + b'\n'
+
+    def _read_cache(self, cache_file: Path, content_hash: str) -> Optional[pd.DataFrame]:
+        """
+        Read a master list cache entry if it was written for this spreadsheet
+        by a compatible version
+
+        The plain-text header is checked before anything is unpickled.
+
+        Args:
+            cache_file: Path to cache file
+            content_hash: SHA-256 of the spreadsheet
+
+        Returns:
+            Cached DataFrame or None
+        """
+        expected = self._cache_header(content_hash)
+        try:
+            with open(cache_file, 'rb') as f:
+                if f.readline(len(expected) + 1) != expected:
+                    return None
+                master_df = pickle.load(f)
+        except Exception:
+            # Missing, truncated or unreadable cache, just rebuild it
+            return None
+
+        return master_df if isinstance(master_df, pd.DataFrame) else None
+
+    def _write_cache(self, cache_file: Path, content_hash: str, master_df: pd.DataFrame):
+        """
+        Atomically write a master list cache entry
+
+        Args:
+            cache_file: Path to cache file
+            content_hash: SHA-256 of the spreadsheet
+            master_df: Normalized master list
+        """
+        temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_file, 'wb') as f:
+                f.write(self._cache_header(content_hash))
+                pickle.dump(master_df, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            # Caching is best effort, the next load just parses the spreadsheet again
+            print(f"Warning: Could not write master list cache {cache_file}: {e}")
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+
+    def _hash_file(self, file_path: str) -> str:
+        """
+        Compute the SHA-256 content hash of a file
+
+        Args:
+            file_path: Path to file
+
+        Returns:
+            Hex digest
         """
-        self.master_df = self._load_master_list(master_file)
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
 
     def _load_master_list(self, file_path: str) -> pd.DataFrame:
         """
@@ -36,6 +203,12 @@ class ProductMatcher:
         # Extract dimension length
         df['Dimension_Length'] = df['Dimension'].apply(self._extract_dimension_length)
 
+        # Normalize lengths to whole feet the same way PO lengths are normalized
+        df['Length_Feet'] = pd.to_numeric(
+            df["Dimension_Length"].astype(str).str.replace(r"[^\d]", "", regex=True),
+            errors='coerce'
+        ).fillna(0).astype(int)
+
         return df
 
     def _extract_product_code(self, description: Any) -> Optional[str]:
@@ -89,110 +262,160 @@ class ProductMatcher:
             # If no *, it's already just the length
             return dim_str.strip()
 
-    def match_products(self, products: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    def _build_index(self, master_df: pd.DataFrame) -> Mapping[Tuple[str, int], MasterRecord]:
         """
-        Match extracted products with master list
+        Build the (Product_Code, Dimension_Length) lookup index
 
         Args:
-            products: List of extracted products
+            master_df: Processed master DataFrame
 
         Returns:
-            List of matched products with full information
+            Read-only mapping of (product code, length in feet) to master record
+        """
+        index = {}
+        for code, length, sku, description, quantity in zip(
+                master_df["Product_Code"], master_df["Length_Feet"], master_df["SKU#"],
+                master_df["PRODUCT DESCRIPTION"], master_df["QUANTITY"]):
+            if pd.isna(code):
+                continue
+            # Keep the first row when the master list has duplicate keys
+            quantity = str(quantity) if pd.notna(quantity) else ""
+            index.setdefault((code, int(length)), MasterRecord(
+                sku=sku if pd.notna(sku) else "",
+                description=description if pd.notna(description) else "",
+                quantity=quantity,
+                per_unit=self._extract_per_unit(quantity)
+            ))
+
+        return MappingProxyType(index)
+
+    def match_products(self, products: Iterable[LineItem],
+                       progress: Optional[Callable[[str], None]] = None) -> LineItemBatch:
         """
-        # Convert to DataFrame for easier processing
-        products_df = pd.DataFrame(products)
+        Match extracted products with master list
 
-        if products_df.empty:
-            return []
+        Args:
+            products: Parsed line items
+            progress: Optional callback told about each misread code matched
+                      to a different master code
 
-        # *** CHANGES START HERE ***
-        # Handle None/empty dimensions - filter them out or provide defaults
-        products_df = products_df.dropna(subset=['dimensions'])  # Remove rows with no dimensions
-        products_df = products_df[products_df['dimensions'].str.strip() != '']  # Remove empty strings
+        Returns:
+            Line items with their master list fields filled in
+        """
+        # Skip products with no dimensions
+        products = [p for p in products if p.dimensions and p.dimensions.strip()]
+
+        # Without a single "count/length" dimension the PO can't be matched
+        if not any('/' in p.dimensions for p in products):
+            return LineItemBatch()
+
+        # POs repeat the same dimensions and products, so each distinct one
+        # is split and looked up once, then the output is assembled by column
+        dimension_cache: Dict[str, Tuple[int, int]] = {}
+        match_cache: Dict[Tuple[str, int], Tuple[MasterRecord, float]] = {}
+        piece_counts, lengths, records, scores = [], [], [], []
+        for product in products:
+            split = dimension_cache.get(product.dimensions)
+            if split is None:
+                split = dimension_cache[product.dimensions] = self._split_dimensions(product.dimensions)
+            piece_counts.append(split[0])
+            lengths.append(split[1])
+
+            key = (product.product_code, split[1])
+            match = match_cache.get(key)
+            if match is None:
+                record = self.index.get(key)
+                if record is not None:
+                    match = match_cache[key] = (record, 1.0)
+                else:
+                    match = match_cache[key] = self._fuzzy_lookup(*key, progress)
+            records.append(match[0])
+            scores.append(match[1])
+
+        return LineItemBatch.from_columns({
+            'product_code': [p.product_code for p in products],
+            'dimensions': [p.dimensions for p in products],
+            'size': [p.size or "" for p in products],
+            'sku': [record.sku for record in records],
+            'description': [record.description for record in records],
+            'length': lengths,
+            'quantity': [self._format_quantity(record, piece_count)
+                         for record, piece_count in zip(records, piece_counts)],
+            'match_score': scores,
+        })
+
+    def _fuzzy_lookup(self, product_code: str, dimension_length: int,
+                      progress: Optional[Callable[[str], None]] = None) -> Tuple[MasterRecord, float]:
+        """
+        Match a product code that isn't in the master list to the closest one
+        stocked in the same length, for codes OCR misread
 
-        if products_df.empty:
-            return []  # No valid products after filtering
+        Args:
+            product_code: Product code as read
+            dimension_length: Length in feet
+            progress: Optional callback told about the match
 
-        # Split dimensions into piece count and length
-        split_dims = products_df["dimensions"].str.split("/", expand=True)
+        Returns:
+            Tuple of master record and match score (EMPTY_RECORD and 0.0 when unmatched)
+        """
+        # A known code was read correctly, the master list just lacks this length
+        if not Config.FUZZY_MATCHING or not product_code or product_code in self.code_index.codes:
+            return EMPTY_RECORD, 0.0
 
-        # Check if we have valid splits
-        if split_dims.shape[1] < 2:
-            return []  # Invalid dimension format
+        match = self.code_index.best_match(
+            product_code, accept=lambda code: (code, dimension_length) in self.index
+        )
+        if match is None:
+            return EMPTY_RECORD, 0.0
 
-        products_df["Piece_Count"] = split_dims[0]
-        products_df["Dimension_Length"] = split_dims[1]
+        if progress is not None:
+            progress(f"Matched misread product code {product_code} to {match.code} (score {match.score:.2f})")
+        return self.index[(match.code, dimension_length)], match.score
 
-        # Handle None values before converting to int
-        products_df["Piece_Count"] = products_df["Piece_Count"].fillna('0')  # Fill None with '0'
-        products_df["Dimension_Length"] = products_df["Dimension_Length"].fillna('0')
+    def _split_dimensions(self, dimensions: str) -> Tuple[int, int]:
+        """
+        Split a "count/length'" dimension into piece count and length
 
-        # Now safely convert to int
-        products_df["Piece_Count"] = pd.to_numeric(products_df["Piece_Count"], errors='coerce').fillna(0).astype(int)
+        Args:
+            dimensions: Dimension string such as "56/12'"
 
-        # Clean dimension length
-        products_df["Dimension_Length"] = (
-            products_df["Dimension_Length"]
-            .str.replace(r"[^\d]", "", regex=True)
-            .replace('', '0')  # Replace empty strings with '0'
-        )
-        products_df["Dimension_Length"] = pd.to_numeric(products_df["Dimension_Length"], errors='coerce').fillna(0).astype(int)
-        # *** CHANGES END HERE ***
-
-        # Clean master dimension length too
-        self.master_df["Dimension_Length"] = (
-            self.master_df["Dimension_Length"]
-            .astype(str)
-            .str.replace(r"[^\d]", "", regex=True)
-        )
-        # Convert to int, handling empty strings
-        self.master_df["Dimension_Length"] = pd.to_numeric(
-            self.master_df["Dimension_Length"], errors='coerce'
-        ).fillna(0).astype(int)
+        Returns:
+            Tuple of piece count and length in feet (0 when unparseable)
+        """
+        parts = dimensions.split('/')
+        piece_count = parts[0].strip()
+        length = NON_DIGIT_RE.sub('', parts[1]) if len(parts) > 1 else ''
 
-        # Merge with master DataFrame
-        merged = products_df.merge(
-            self.master_df,
-            left_on=["product_code", "Dimension_Length"],
-            right_on=["Product_Code", "Dimension_Length"],
-            how="left"
+        return (
+            int(piece_count) if piece_count.isdigit() else 0,
+            int(length) if length else 0
         )
 
-        # Format quantity
-        merged["Final_Quantity"] = merged.apply(self._format_quantity, axis=1)
+    def _extract_per_unit(self, quantity: str) -> int:
+        """
+        Extract the pieces per unit from a master list quantity
 
-        # Create final product list
-        final_products = merged.apply(
-            lambda row: {
-                "product_code": row["product_code"],
-                "SKU#": row["SKU#"] if pd.notna(row["SKU#"]) else "",
-                "Product_Description": row["PRODUCT DESCRIPTION"] if pd.notna(row["PRODUCT DESCRIPTION"]) else "",
-                "Dimension_Length": row["Dimension_Length"],
-                "Quantity": row["Final_Quantity"] if pd.notna(row["Final_Quantity"]) else "",
-                "Size": row["size"] if pd.notna(row["size"]) else ""
-            },
-            axis=1
-        ).tolist()
+        Args:
+            quantity: Master list quantity such as "UNIT @ 56PC.EA."
 
-        return final_products
+        Returns:
+            Pieces per unit, or 0 when the quantity doesn't say
+        """
+        match = PER_UNIT_RE.search(quantity)
+        return int(match.group(1)) if match else 0
 
-    def _format_quantity(self, row: pd.Series) -> str:
+    def _format_quantity(self, record: MasterRecord, piece_count: int) -> str:
         """
         Format quantity string based on piece count and unit quantity
 
         Args:
-            row: DataFrame row
+            record: Matched master record
+            piece_count: Number of pieces ordered
 
         Returns:
             Formatted quantity string
         """
-        if pd.isna(row["QUANTITY"]):
-            return ""
-
-        match = re.search(r"(\d+)PC", str(row["QUANTITY"]))
-        if match:
-            per_unit = int(match.group(1))
-            units = row["Piece_Count"] // per_unit
-            return f"{units} {row['QUANTITY']}"
+        if record.per_unit:
+            return f"{piece_count // record.per_unit} {record.quantity}"
 
-        return str(row["QUANTITY"])
\ No newline at end of file
+        return record.quantity
@@ -0,0 +1,93 @@
+"""
+Resource Usage Module
+Cross-platform peak memory measurement for the current process
+"""
+
+import sys
+from typing import Optional
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Get the peak resident set size of the current process
+
+    Returns:
+        Peak RSS in bytes, or None if it can't be measured on this platform
+    """
+    if sys.platform == 'win32':
+        return _windows_peak_working_set()
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def format_bytes(num_bytes: Optional[int]) -> str:
+    """
+    Format a byte count for display
+
+    Args:
+        num_bytes: Byte count or None
+
+    Returns:
+        Human readable string such as "412.3 MB"
+    """
+    if num_bytes is None:
+        return "n/a"
+    return f"{num_bytes / (1024 * 1024):.1f} MB"
+
+
+def child_cpu_seconds() -> Optional[float]:
+    """
+    Get the CPU time used by finished child processes, such as tesseract and pdftoppm runs
+
+    Returns:
+        User plus system seconds, or None if it can't be measured on this platform
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _windows_peak_working_set() -> Optional[int]:
+    """Read PeakWorkingSetSize through the Win32 process status API"""
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD),
+                ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t),
+                ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t),
+                ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        get_process_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_process_memory_info.argtypes = [
+            wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD
+        ]
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if not get_process_memory_info(handle, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize
+    except Exception:
+        return None
+
@@ -4,12 +4,161 @@ Runtime configuration for finding Tesseract and Poppler
 Place this in your src/ folder
 """
 
+import json
 import os
+import subprocess
 import sys
+import time
 from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+# Bump when the layout of the tool cache file changes
+TOOL_CACHE_VERSION = 1
+
+# How the last configure_tools call went, for startup timing reports
+last_discovery: Dict[str, object] = {}
+
+
+def user_cache_dir() -> Path:
+    """Per-user directory for caches that should survive between runs"""
+    override = os.environ.get('PO_PROCESSOR_CACHE_DIR')
+    if override:
+        return Path(override)
+
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or str(Path.home() / 'AppData' / 'Local')
+    elif sys.platform == 'darwin':
+        base = str(Path.home() / 'Library' / 'Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or str(Path.home() / '.cache')
+
+    return Path(base) / 'DisderoPoExcelCreator'
 
 
 def find_tesseract():
+    """Find Tesseract executable, trying the path remembered from the last launch first"""
+    return _find_tesseract()[0]
+
+
+def find_poppler():
+    """Find Poppler bin directory, trying the path remembered from the last launch first"""
+    return _find_poppler()[0]
+
+
+def tool_versions() -> Dict[str, Optional[str]]:
+    """Versions recorded when Tesseract and Poppler were last discovered"""
+    cache = _load_tool_cache()
+    return {name: cache.get(name, {}).get('version') for name in ('tesseract', 'poppler')}
+
+
+def _find_tesseract() -> Tuple[Optional[str], bool]:
+    """Find Tesseract, returning its path and whether it came from the tool cache"""
+    # Check environment variable first
+    env_path = os.environ.get('TESSERACT_PATH')
+    if env_path and os.path.exists(env_path):
+        return env_path, False
+
+    return _find_cached_tool(
+        'tesseract', _discover_tesseract,
+        check_path=lambda path: path,
+        version_args=lambda path: [path, '--version']
+    )
+
+
+def _find_poppler() -> Tuple[Optional[str], bool]:
+    """Find Poppler, returning its bin directory and whether it came from the tool cache"""
+    # Check environment variable first
+    env_path = os.environ.get('POPPLER_PATH')
+    if env_path and os.path.exists(env_path):
+        return env_path, False
+
+    return _find_cached_tool(
+        'poppler', _discover_poppler,
+        check_path=lambda path: os.path.join(path, 'pdftoppm.exe'),
+        version_args=lambda path: [os.path.join(path, 'pdftoppm.exe'), '-v']
+    )
+
+
+def _find_cached_tool(name: str, discover: Callable[[], Optional[str]],
+                      check_path: Callable[[str], str],
+                      version_args: Callable[[str], list]) -> Tuple[Optional[str], bool]:
+    """
+    Return a tool's cached location if it still exists, otherwise discover and cache it
+
+    Args:
+        name: Tool cache entry name
+        discover: Full search, returning the tool location or None
+        check_path: Maps the location to the file whose existence validates it
+        version_args: Maps the location to a command printing the tool version
+
+    Returns:
+        Tuple of tool location (or None) and whether it came from the cache
+    """
+    cache = _load_tool_cache()
+    cached_path = cache.get(name, {}).get('path')
+    # A single existence check on launch; only a failed check costs a full search
+    if cached_path and os.path.exists(check_path(cached_path)):
+        return cached_path, True
+
+    path = discover()
+    if path:
+        cache[name] = {'path': path, 'version': _tool_version(version_args(path))}
+        _save_tool_cache(cache)
+    return path, False
+
+
+def _tool_cache_file() -> Path:
+    """Location of the tool cache file"""
+    return user_cache_dir() / 'tools.json'
+
+
+def _load_tool_cache() -> Dict[str, dict]:
+    """Read the tool cache, treating a missing, unreadable or outdated file as empty"""
+    try:
+        with open(_tool_cache_file(), encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(cached, dict) or cached.get('format') != TOOL_CACHE_VERSION:
+        return {}
+    return cached.get('tools', {})
+
+
+def _save_tool_cache(tools: Dict[str, dict]):
+    """Write the tool cache atomically"""
+    cache_file = _tool_cache_file()
+    temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'format': TOOL_CACHE_VERSION, 'tools': tools}, f, indent=2)
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        # Caching is best effort, the next launch just searches again
+        print(f"Warning: Could not write tool cache {cache_file}: {e}")
+
+
+def _tool_version(args: list) -> Optional[str]:
+    """First line a tool prints for its version flag, or None if it can't be run"""
+    try:
+        result = subprocess.run(
+            args,
+            capture_output=True,
+            text=True,
+            timeout=10,
+            # Don't flash a console window from the windowed GUI build
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    # pdftoppm prints its version to stderr
+    output = (result.stdout or result.stderr).strip()
+    return output.split('\n')[0] if output else None
+
+
+def _discover_tesseract():
     """Find Tesseract executable in common installation locations"""
     tesseract_paths = [
         r'C:\Program Files\Tesseract-OCR\tesseract.exe',
@@ -17,11 +166,6 @@ def find_tesseract():
         r'C:\Users\{}\AppData\Local\Tesseract-OCR\tesseract.exe'.format(os.environ.get('USERNAME', '')),
     ]
 
-    # Check environment variable first
-    env_path = os.environ.get('TESSERACT_PATH')
-    if env_path and os.path.exists(env_path):
-        return env_path
-
     # Check common paths
     for path in tesseract_paths:
         if os.path.exists(path):
@@ -36,7 +180,7 @@ def find_tesseract():
     return None
 
 
-def find_poppler():
+def _discover_poppler():
     """Find Poppler bin directory in common installation locations"""
     poppler_paths = [
         r'C:\Program Files\poppler-25.07.0\Library\bin',
@@ -47,11 +191,6 @@ def find_poppler():
         r'C:\Program Files (x86)\poppler\Library\bin',
     ]
 
-    # Check environment variable first
-    env_path = os.environ.get('POPPLER_PATH')
-    if env_path and os.path.exists(env_path):
-        return env_path
-
     # Check common paths
     for path in poppler_paths:
         if os.path.exists(path) and os.path.exists(os.path.join(path, 'pdftoppm.exe')):
@@ -74,8 +213,10 @@ def configure_tools():
     """Configure Tesseract and Poppler paths"""
     import pytesseract
 
+    start = time.perf_counter()
+
     # Configure Tesseract
-    tesseract_path = find_tesseract()
+    tesseract_path, tesseract_cached = _find_tesseract()
     if tesseract_path:
         pytesseract.pytesseract.tesseract_cmd = tesseract_path
         print(f"Tesseract found at: {tesseract_path}")
@@ -87,7 +228,7 @@ def configure_tools():
         )
 
     # Configure and return Poppler path
-    poppler_path = find_poppler()
+    poppler_path, poppler_cached = _find_poppler()
     if poppler_path:
         print(f"Poppler found at: {poppler_path}")
     else:
@@ -97,4 +238,9 @@ def configure_tools():
             "If installed in a custom location, set the POPPLER_PATH environment variable."
         )
 
+    last_discovery['seconds'] = time.perf_counter() - start
+    last_discovery['cached'] = tesseract_cached and poppler_cached
+    print(f"Tool discovery took {last_discovery['seconds'] * 1000:.1f} ms"
+          f"{' (cached)' if last_discovery['cached'] else ''}")
+
     return tesseract_path, poppler_path
\ No newline at end of file
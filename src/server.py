@@ -0,0 +1,353 @@
+"""
+HTTP Service Module
+Serves a warm pipeline on a local port so other programs can submit POs
+"""
+
+import json
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.parser import BytesParser
+from email.policy import HTTP
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from .config import Config
+from .instrumentation import RunMetrics
+from .pipeline import POPipeline
+from .product_matcher import ProductMatcher
+from .runtime_config import tool_versions
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class ServiceError(Exception):
+    """A request the service refuses, with the HTTP status to answer with"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class POService:
+    """
+    The warm pipeline behind the HTTP handler
+
+    One pipeline, and so one master list and one set of OCR workers, serves
+    every request. At most `jobs` PDFs are processed at once and up to
+    `queue_size` more wait for a worker; beyond that uploads are turned away
+    with 503 so a burst can't pile up unbounded work.
+    """
+
+    def __init__(self, pipeline: POPipeline, master_file: str, jobs: int,
+                 queue_size: int = Config.SERVER_QUEUE_SIZE):
+        """
+        Initialize the service
+
+        Args:
+            pipeline: Pipeline with its master list already loaded
+            master_file: Path the master list was loaded from
+            jobs: PDFs processed concurrently
+            queue_size: Uploads allowed to wait for a worker
+        """
+        self.pipeline = pipeline
+        self.master_file = master_file
+        self.master_loaded_at = datetime.now().isoformat(timespec='seconds')
+        self.jobs = jobs
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix='po-job')
+        self._slots = threading.BoundedSemaphore(jobs + queue_size)
+        self._reload_lock = threading.Lock()
+        self._counts_lock = threading.Lock()
+        self._accepted = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._started = time.perf_counter()
+
+    def warm_up(self):
+        """Start the OCR workers now rather than on the first upload"""
+        try:
+            self.pipeline.ocr_extractor.warm_up()
+        except Exception as e:
+            # Text-layer PDFs can still be served, OCR will report its own errors
+            print(f"Warning: Could not warm up OCR: {e}")
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold a place in the queue for one upload, or refuse it with 503
+
+        Taken before the upload is read, so the queue limit also bounds how
+        many request bodies are held in memory at once.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE,
+                               f"Queue is full ({self.jobs} running, {self.queue_size} waiting), retry later")
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def process(self, pdf_bytes: bytes, filename: str, output: str) -> Tuple[str, Any]:
+        """
+        Queue an uploaded PDF and wait for its result; call inside slot()
+
+        Args:
+            pdf_bytes: PDF file contents
+            filename: Uploaded file name, for logs and metrics
+            output: "xlsx" for the report, "json" for the matched line items
+
+        Returns:
+            Tuple of PO number and either the report bytes or a JSON-serializable dict
+        """
+        with self._counts_lock:
+            self._accepted += 1
+        return self._executor.submit(self._run, pdf_bytes, filename, output).result()
+
+    def _run(self, pdf_bytes: bytes, filename: str, output: str) -> Tuple[str, Any]:
+        """Process one upload on a worker thread"""
+        with self._counts_lock:
+            self._running += 1
+        try:
+            with tempfile.TemporaryDirectory(prefix='po_service_') as work_dir:
+                pdf_path = Path(work_dir) / 'upload.pdf'
+                pdf_path.write_bytes(pdf_bytes)
+                metrics = RunMetrics(filename)
+
+                if output == 'json':
+                    po_number, items = self.pipeline.process_to_items(str(pdf_path), metrics=metrics)
+                    result = {
+                        'po_number': po_number,
+                        'line_items': [item._asdict() for item in items],
+                        'metrics': metrics.to_dict(),
+                    }
+                else:
+                    po_number, output_file = self.pipeline.process(str(pdf_path), work_dir, metrics=metrics)
+                    result = output_file.read_bytes()
+
+            with self._counts_lock:
+                self._completed += 1
+            return po_number, result
+        except Exception:
+            with self._counts_lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._counts_lock:
+                self._running -= 1
+
+    def reload_master(self) -> Dict[str, Any]:
+        """
+        Load the configured master list again and swap it in
+
+        The path is fixed when the service starts; requests can only ask for
+        it to be re-read. Jobs already running finish with whichever list
+        they started matching against; later jobs use the new one.
+
+        Returns:
+            Health report after the reload
+        """
+        master_file = self.master_file
+        if not Path(master_file).is_file():
+            raise ServiceError(HTTPStatus.NOT_FOUND, f"Master file not found: {master_file}")
+
+        with self._reload_lock:
+            try:
+                matcher = ProductMatcher(master_file)
+            except Exception as e:
+                raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY, f"Could not load master file: {e}")
+            self.pipeline.matcher = matcher
+            self.master_loaded_at = datetime.now().isoformat(timespec='seconds')
+            print(f"Master list reloaded from {master_file} ({len(matcher.index)} products)")
+
+        return self.health()
+
+    def health(self) -> Dict[str, Any]:
+        """Service state for the health endpoint"""
+        with self._counts_lock:
+            waiting = self._accepted - self._completed - self._failed - self._running
+            return {
+                'status': 'ok',
+                'uptime_seconds': round(time.perf_counter() - self._started, 1),
+                'master_file': str(self.master_file),
+                'master_loaded_at': self.master_loaded_at,
+                'master_products': len(self.pipeline.matcher.index),
+                'jobs': {
+                    'workers': self.jobs,
+                    'running': self._running,
+                    'waiting': waiting,
+                    'queue_size': self.queue_size,
+                    'completed': self._completed,
+                    'failed': self._failed,
+                },
+                'tools': tool_versions(),
+            }
+
+    def close(self):
+        """Finish running jobs and stop the OCR workers"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.pipeline.close()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes:
+      GET  /health                  service, master list and queue state
+      POST /process[?format=json]   PDF upload, either the raw body or a
+                                    multipart form file; returns the xlsx
+                                    report, or line items as JSON
+      POST /reload-master           re-read the master list the service was
+                                    started with; needs Content-Type
+                                    application/json and an empty or {} body
+
+    Requests carrying an Origin header come from a web page and are refused,
+    so a site open in the clerk's browser can't drive the service.
+    """
+
+    server_version = "DisderoPOService/1.0"
+
+    @property
+    def service(self) -> POService:
+        return self.server.service
+
+    def do_GET(self):
+        route = urlparse(self.path).path
+        if route == '/health':
+            self._send_json(HTTPStatus.OK, self.service.health())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': f"Unknown path: {route}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        try:
+            if self.headers.get('Origin') is not None:
+                raise ServiceError(HTTPStatus.FORBIDDEN, "Requests from web pages are not accepted")
+            if url.path == '/process':
+                self._handle_process(parse_qs(url.query))
+            elif url.path == '/reload-master':
+                # Browsers can't send this cross-site without a preflight, which is never answered
+                if self.headers.get_content_type() != 'application/json':
+                    raise ServiceError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Content-Type must be application/json")
+                body = self._read_body(required=False)
+                try:
+                    options = json.loads(body) if body.strip() else {}
+                except ValueError as e:
+                    # Bodies that aren't UTF-8 raise UnicodeDecodeError rather than JSONDecodeError
+                    raise ServiceError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}")
+                if not isinstance(options, dict):
+                    raise ServiceError(HTTPStatus.BAD_REQUEST, "Expected a JSON object")
+                if options:
+                    raise ServiceError(HTTPStatus.BAD_REQUEST,
+                                       f"Unexpected field(s): {', '.join(options)}; the master list "
+                                       f"path is set when the service starts")
+                self._send_json(HTTPStatus.OK, self.service.reload_master())
+            else:
+                self._send_json(HTTPStatus.NOT_FOUND, {'error': f"Unknown path: {url.path}"})
+        except ServiceError as e:
+            headers = {'Retry-After': '5'} if e.status == HTTPStatus.SERVICE_UNAVAILABLE else None
+            self._send_json(e.status, {'error': str(e)}, headers)
+        except Exception as e:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"Processing failed: {e}"})
+
+    def _handle_process(self, query: Dict[str, list]):
+        """Process an uploaded PDF and send back the report or line items"""
+        output = query.get('format', ['xlsx'])[0].lower()
+        if output not in ('xlsx', 'json'):
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"Unknown format: {output}")
+
+        with self.service.slot():
+            pdf_bytes, filename = self._read_pdf()
+            po_number, result = self.service.process(pdf_bytes, filename, output)
+            # Don't hold the upload while a slow client reads the response
+            del pdf_bytes
+
+        if output == 'json':
+            self._send_json(HTTPStatus.OK, result)
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', XLSX_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(result)))
+        self.send_header('Content-Disposition', f'attachment; filename="Disdero #{po_number}.xlsx"')
+        self.send_header('X-PO-Number', po_number)
+        self.end_headers()
+        self.wfile.write(result)
+
+    def _read_body(self, required: bool = True) -> bytes:
+        """Read the request body, enforcing the upload size limit"""
+        length = self.headers.get('Content-Length')
+        if length is None:
+            if not required:
+                return b''
+            raise ServiceError(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required")
+        if not length.isdigit():
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if int(length) > Config.SERVER_MAX_UPLOAD_MB * 1024 * 1024:
+            raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                               f"Upload is larger than {Config.SERVER_MAX_UPLOAD_MB} MB")
+        return self.rfile.read(int(length))
+
+    def _read_pdf(self) -> Tuple[bytes, str]:
+        """
+        Read the uploaded PDF from a raw body or a multipart form
+
+        Returns:
+            Tuple of PDF bytes and file name
+        """
+        body = self._read_body()
+        content_type = self.headers.get('Content-Type', '')
+        filename = 'upload.pdf'
+
+        if content_type.startswith('multipart/form-data'):
+            message = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + body
+            )
+            parts = [part for part in message.iter_parts() if part.get_filename()]
+            if not parts:
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "No file in the form upload")
+            body = parts[0].get_payload(decode=True) or b''
+            filename = parts[0].get_filename()
+
+        if not body.startswith(b'%PDF'):
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Upload is not a PDF")
+        return body, filename
+
+    def _send_json(self, status: HTTPStatus, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        """Send a JSON response"""
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(service: POService, host: str = Config.SERVER_HOST, port: int = Config.SERVER_PORT):
+    """
+    Serve requests until interrupted
+
+    Args:
+        service: Service to expose
+        host: Interface to listen on
+        port: Port to listen on
+    """
+    httpd = ThreadingHTTPServer((host, port), RequestHandler)
+    httpd.daemon_threads = True
+    httpd.service = service
+    print(f"Serving on http://{host}:{httpd.server_port} "
+          f"({service.jobs} worker(s), {service.queue_size} queued), Ctrl+C to stop")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        httpd.server_close()
+        service.close()
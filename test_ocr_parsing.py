@@ -6,19 +6,18 @@ Run this to test the complete pipeline with your actual PDF
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import date
 import pandas as pd
 
-# Add src to path
-sys.path.insert(0, 'src')
-
 # Import all modules
-from pdf_processor import PDFProcessor
-from ocr_extractor import OCRExtractor
-from product_matcher import ProductMatcher
-from excel_generator import ExcelGenerator
-from config import Config
+from src.pdf_processor import PDFProcessor
+from src.ocr_extractor import OCRExtractor
+from src.product_matcher import ProductMatcher
+from src.excel_generator import ExcelGenerator
+from src.config import Config
+from src.line_items import LineItem, LineItemBatch
 
 
 def test_pdf_processor(pdf_path):
@@ -82,9 +81,9 @@ def test_ocr_extractor(combined_image):
     for i, block in enumerate(blocks[:3], 1):  # Show first 3
         parsed = extractor.parse_product_block(block)
         print(f"\n  Block {i}:")
-        print(f"    Product Code: {parsed.get('product_code')}")
-        print(f"    Size: {parsed.get('size')}")
-        print(f"    Dimensions: {parsed.get('dimensions')}")
+        print(f"    Product Code: {parsed.product_code}")
+        print(f"    Size: {parsed.size}")
+        print(f"    Dimensions: {parsed.dimensions}")
 
     # Test full document parsing
     print("\n5. Parsing complete document...")
@@ -96,6 +95,31 @@ def test_ocr_extractor(combined_image):
     return ocr_text, po_number, products
 
 
+def test_line_item_batch(products):
+    """Test that a line item batch reads back exactly like the items put in"""
+    print("\n" + "=" * 60)
+    print("TESTING LINE ITEM BATCH")
+    print("=" * 60)
+
+    items = list(products)
+    batch = LineItemBatch(items)
+
+    print(f"\n1. Round-tripping {len(items)} line items...")
+    if list(batch) != items or [batch[i] for i in range(len(batch))] != items:
+        print("✗ Batch contents differ from the items added")
+        return False
+    print("✓ Iteration and indexing return the original items")
+
+    columns = {name: batch.column(name) for name in LineItem._fields}
+    if LineItemBatch.from_columns(columns) != batch:
+        print("✗ Batch built from columns differs")
+        return False
+    print("✓ Column round trip matches")
+
+    print(f"✓ Per-line storage: {batch.nbytes()} bytes for {len(batch)} items")
+    return True
+
+
 def test_product_matcher(products, master_file='productslist.xlsx'):
     """Test product matching functions"""
     print("\n" + "=" * 60)
@@ -122,22 +146,56 @@ def test_product_matcher(products, master_file='productslist.xlsx'):
     print("\n3. Sample matching results:")
     for i, product in enumerate(matched_products[:5], 1):
         print(f"\n  Product {i}:")
-        print(f"    Code: {product.get('product_code')}")
-        print(f"    SKU: {product.get('SKU#')}")
-        print(f"    Size: {product.get('Size')}")
-        print(f"    Dimension: {product.get('Dimension_Length')}")
-        print(f"    Quantity: {product.get('Quantity')}")
+        print(f"    Code: {product.product_code}")
+        print(f"    SKU: {product.sku}")
+        print(f"    Size: {product.size}")
+        print(f"    Dimension: {product.length}")
+        print(f"    Quantity: {product.quantity}")
+        print(f"    Match score: {product.match_score:.2f}")
 
     # Check for unmatched products
-    unmatched = [p for p in matched_products if not p.get('SKU#')]
+    unmatched = [p for p in matched_products if not p.sku]
     if unmatched:
         print(f"\n⚠ Unmatched products: {len(unmatched)}")
         for p in unmatched[:3]:
-            print(f"  - {p.get('product_code')} / {p.get('Dimension_Length')}")
+            print(f"  - {p.product_code} / {p.length}")
 
     return matched_products
 
 
+def test_matcher_thread_safety(products, master_file='productslist.xlsx', threads=8, calls=200):
+    """Test that one matcher gives the same results when shared by many threads"""
+    print("\n" + "=" * 60)
+    print("TESTING PRODUCT MATCHER THREAD SAFETY")
+    print("=" * 60)
+
+    if not os.path.exists(master_file):
+        print(f"⚠ Master file not found: {master_file}")
+        return False
+
+    matcher = ProductMatcher(master_file)
+
+    if not products:
+        # No PO parsed, so order every master product, plus a misread code
+        products = [LineItem(code, f"56/{length}'", '2X4') for code, length in matcher.index]
+        code, length = next(iter(matcher.index))
+        products.append(LineItem(code.replace('0', 'O'), f"56/{length}'", '2X4'))
+
+    expected = matcher.match_products(products)
+
+    print(f"\n1. Running {calls} match_products calls on {threads} threads...")
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda _: matcher.match_products(products), range(calls)))
+
+    mismatches = sum(1 for result in results if result != expected)
+    if mismatches:
+        print(f"✗ {mismatches} of {calls} calls returned different results")
+        return False
+
+    print(f"✓ All {calls} calls matched {len(expected)} products identically")
+    return True
+
+
 def test_excel_generator(po_number, matched_products):
     """Test Excel report generation"""
     print("\n" + "=" * 60)
@@ -200,12 +258,11 @@ def run_complete_pipeline(pdf_path):
         print("\nStep 1: Processing PDF...")
         processor = PDFProcessor(dpi=300)
         images = processor.convert_pdf_to_images(pdf_path)
-        combined = processor.combine_images_vertically(images)
 
         # Step 2: Extract text
         print("Step 2: Extracting text...")
         extractor = OCRExtractor()
-        ocr_text = extractor.extract_text(combined)
+        ocr_text = extractor.extract_text_from_pages(images)
         parsed_data = extractor.parse_document(ocr_text)
         po_number, products = list(parsed_data.items())[0]
 
@@ -230,7 +287,7 @@ def run_complete_pipeline(pdf_path):
         # Calculate total units
         total_units = 0
         for p in matched_products:
-            qty_str = str(p.get('Quantity', ''))
+            qty_str = p.quantity
             if qty_str:
                 parts = qty_str.split()
                 if parts and parts[0].isdigit():
@@ -261,7 +318,9 @@ def main():
     # Test individual modules
     images, combined = test_pdf_processor(pdf_path)
     ocr_text, po_number, products = test_ocr_extractor(combined)
+    test_line_item_batch(products)
     matched_products = test_product_matcher(products)
+    test_matcher_thread_safety(products)
 
     if matched_products:
         test_excel_generator(po_number, matched_products)